@@ -0,0 +1,191 @@
+import os
+import re
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Article, ArticleCount, TermCount
+
+logger = logging.getLogger(__name__)
+
+# Aggregates outlive the articles themselves (see retention)
+STATS_RETENTION_DAYS = int(os.getenv("STATS_RETENTION_DAYS", "180"))
+MAX_WINDOW_DAYS = 90
+TOP_KEYWORDS = 15
+CHUNK_SIZE = 500
+
+# Same filter the dashboard's keyword cloud used to apply in the browser
+STOPWORDS = {
+    'this', 'that', 'with', 'from', 'your', 'their', 'they', 'them', 'these', 'those', 'which', 'what',
+    'where', 'when', 'could', 'would', 'should', 'about', 'after', 'before', 'using', 'against', 'during',
+    'through', 'between', 'under', 'over', 'cyber', 'security', 'news', 'attack', 'data', 'breach',
+    'report', 'new', 'more', 'first', 'been', 'were', 'also', 'will', 'have', 'hackers', 'malware',
+    'ransomware', 'users', 'company', 'service', 'million', 'billion'
+}
+MIN_TERM_LENGTH = 5
+
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_WINDOW_RE = re.compile(r'^(\d+)d?$')
+
+def title_terms(title: str) -> List[str]:
+    """Keywords counted for a title: lowercased words of 5+ chars, minus stopwords."""
+    words = _PUNCT_RE.sub('', (title or '').lower()).split()
+    return [w for w in words if len(w) >= MIN_TERM_LENGTH and w not in STOPWORDS]
+
+def _day(value: Optional[datetime]) -> date:
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+def _chunks(items: List[Any], size: int = CHUNK_SIZE) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _bump(db: Session, model, key_names: Tuple[str, ...], counts: Counter):
+    """Adds signed deltas to counter rows with one upsert per chunk."""
+    rows = [dict(zip(key_names, key), count=n) for key, n in counts.items() if n]
+    for chunk in _chunks(rows):
+        stmt = insert(model).values(chunk)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=list(key_names),
+            set_={"count": model.count + stmt.excluded.count}
+        ))
+
+def record_articles(db: Session, rows: List[Dict[str, Any]]):
+    """Counts newly stored articles."""
+    terms: Counter = Counter()
+    groups: Counter = Counter()
+    for row in rows:
+        day = _day(row.get("created_at"))
+        for term in title_terms(row.get("title")):
+            terms[(day, term)] += 1
+        groups[(day, row.get("category") or "General", row.get("severity") or "Medium", row.get("source") or "")] += 1
+    _bump(db, TermCount, ("day", "term"), terms)
+    _bump(db, ArticleCount, ("day", "category", "severity", "source"), groups)
+
+def record_reclassified(db: Session, changes: List[Tuple[Optional[datetime], str, str, str, str, str]]):
+    """Moves articles between buckets after the AI assigns category/severity.
+
+    Each change is (created_at, source, old_category, old_severity, new_category, new_severity).
+    """
+    groups: Counter = Counter()
+    for created_at, source, old_cat, old_sev, new_cat, new_sev in changes:
+        if (old_cat, old_sev) == (new_cat, new_sev):
+            continue
+        day = _day(created_at)
+        groups[(day, old_cat or "General", old_sev or "Medium", source or "")] -= 1
+        groups[(day, new_cat or "General", new_sev or "Medium", source or "")] += 1
+    _bump(db, ArticleCount, ("day", "category", "severity", "source"), groups)
+
+def backfill(db: Session):
+    """Builds the aggregates from stored articles the first time the tables are empty."""
+    if db.scalar(select(ArticleCount.day).limit(1)) is not None:
+        return
+    rows = db.execute(select(Article.title, Article.source, Article.category, Article.severity, Article.created_at)).mappings().all()
+    if not rows:
+        return
+    record_articles(db, [dict(r) for r in rows])
+    db.commit()
+    logger.info(f"Analytics backfilled from {len(rows)} articles.")
+
+def prune(db: Session):
+    """Drops aggregate days past STATS_RETENTION_DAYS."""
+    cutoff = datetime.now(timezone.utc).date() - timedelta(days=STATS_RETENTION_DAYS)
+    db.execute(delete(TermCount).where(TermCount.day < cutoff))
+    db.execute(delete(ArticleCount).where(ArticleCount.day < cutoff))
+
+def parse_window(window: str) -> int:
+    """'7d' or '7' -> 7 days (today inclusive)."""
+    match = _WINDOW_RE.match((window or "").strip().lower())
+    days = int(match.group(1)) if match else 0
+    if not 1 <= days <= MAX_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail=f"window must be 1d..{MAX_WINDOW_DAYS}d")
+    return days
+
+def _with_delta(current: Dict[str, int], previous: Dict[str, int]) -> List[Dict[str, Any]]:
+    return [
+        {"name": name, "count": count, "previous": previous.get(name, 0), "delta": count - previous.get(name, 0)}
+        for name, count in sorted(current.items(), key=lambda kv: (-kv[1], kv[0]))
+    ]
+
+async def get_stats(db: AsyncSession, days: int) -> Dict[str, Any]:
+    """Dashboard aggregates for the last `days` days, with deltas against the window before.
+
+    Reads only the pre-aggregated tables, so cost depends on the window, not on
+    how many articles were stored.
+    """
+    today = datetime.now(timezone.utc).date()
+    since = today - timedelta(days=days - 1)
+    previous_since = since - timedelta(days=days)
+
+    groups = (await db.execute(
+        select(ArticleCount.day, ArticleCount.category, ArticleCount.severity, ArticleCount.source, ArticleCount.count)
+        .where(ArticleCount.day >= previous_since)
+    )).all()
+
+    categories, severities, sources = Counter(), Counter(), Counter()
+    prev_categories, prev_severities, prev_sources = Counter(), Counter(), Counter()
+    matrix: Counter = Counter()
+    per_day: Dict[date, Counter] = {since + timedelta(days=i): Counter() for i in range(days)}
+    total = previous_total = 0
+    for day, category, severity, source, count in groups:
+        if not count:
+            continue
+        if day >= since:
+            total += count
+            categories[category] += count
+            severities[severity] += count
+            sources[source] += count
+            matrix[(category, severity)] += count
+            per_day.setdefault(day, Counter())[category] += count
+        else:
+            previous_total += count
+            prev_categories[category] += count
+            prev_severities[severity] += count
+            prev_sources[source] += count
+
+    top_terms = (await db.execute(
+        select(TermCount.term, func.sum(TermCount.count).label("n"))
+        .where(TermCount.day >= since)
+        .group_by(TermCount.term)
+        .having(func.sum(TermCount.count) > 0)
+        .order_by(func.sum(TermCount.count).desc(), TermCount.term)
+        .limit(TOP_KEYWORDS)
+    )).all()
+    previous_terms = dict((await db.execute(
+        select(TermCount.term, func.sum(TermCount.count))
+        .where(TermCount.day >= previous_since, TermCount.day < since,
+               TermCount.term.in_([t for t, _ in top_terms]))
+        .group_by(TermCount.term)
+    )).all()) if top_terms else {}
+
+    return {
+        "window_days": days,
+        "since": since.isoformat(),
+        "total": total,
+        "previous_total": previous_total,
+        "categories": _with_delta(categories, prev_categories),
+        "severities": _with_delta(severities, prev_severities),
+        "sources": _with_delta(sources, prev_sources),
+        "matrix": [
+            {"category": c, "severity": s, "count": n}
+            for (c, s), n in sorted(matrix.items(), key=lambda kv: -kv[1])
+        ],
+        "keywords": [
+            {"text": term, "count": n, "previous": previous_terms.get(term, 0), "delta": n - previous_terms.get(term, 0)}
+            for term, n in top_terms
+        ],
+        "trend": [
+            {"day": day.isoformat(), "total": sum(counts.values()), "categories": dict(counts)}
+            for day, counts in sorted(per_day.items())
+        ],
+    }
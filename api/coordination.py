@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert
+
+from models import AsyncSessionLocal, Lease, StreamEvent
+
+logger = logging.getLogger(__name__)
+
+# "sqlite" coordinates workers/replicas through the shared DB; "none" assumes a single process
+COORDINATION = os.getenv("COORDINATION", "sqlite")
+LEASE_NAME = "scheduler"
+LEASE_TTL = float(os.getenv("LEADER_LEASE_TTL", "30"))           # Seconds a lease stays valid without renewal
+EVENT_BUS_POLL = float(os.getenv("EVENT_BUS_POLL", "0.5"))        # Seconds between stream_events polls
+EVENT_BUS_RETENTION = int(os.getenv("EVENT_BUS_RETENTION", "5000"))  # Newest rows kept in stream_events
+
+def worker_id() -> str:
+    """Unique name for this process, stable for its lifetime."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+class LeaderLease:
+    """Leader election over a lease row in the shared database.
+
+    Every process tries to take or renew the lease every TTL/3 seconds; the
+    insert only succeeds when the row is free, expired or already ours, so at
+    most one process leads at a time. A crashed leader is replaced after TTL.
+
+    The election and demotion handlers run as tasks of their own, so slow
+    start-up work never delays a renewal past the TTL.
+    """
+
+    def __init__(self, on_elected: Optional[Callable[[], Awaitable[None]]] = None,
+                 on_demoted: Optional[Callable[[], Awaitable[None]]] = None,
+                 name: str = LEASE_NAME, ttl: float = LEASE_TTL, enabled: bool = COORDINATION == "sqlite"):
+        self.name = name
+        self.ttl = ttl
+        self.enabled = enabled
+        self.holder = worker_id()
+        self.is_leader = False
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self._expires_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._handler: Optional[asyncio.Task] = None
+
+    async def try_acquire(self) -> bool:
+        now = time.time()
+        stmt = insert(Lease).values(name=self.name, holder=self.holder, expires_at=now + self.ttl)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Lease.name],
+            set_={"holder": stmt.excluded.holder, "expires_at": stmt.excluded.expires_at},
+            where=(Lease.holder == self.holder) | (Lease.expires_at < now)
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            holder = await db.scalar(select(Lease.holder).where(Lease.name == self.name))
+            await db.commit()
+        if holder == self.holder:
+            self._expires_at = now + self.ttl
+            return True
+        return False
+
+    async def release(self):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Lease).where(Lease.name == self.name, Lease.holder == self.holder))
+            await db.commit()
+
+    async def start(self):
+        """Runs the first election immediately, then keeps renewing in the background."""
+        if not self.enabled:
+            await self._set_leader(True)
+            return
+        await self._tick()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        was_leader = self.is_leader
+        if was_leader:
+            await self._set_leader(False)
+        if self._handler is not None:
+            # Let the demotion handler finish before handing the lease over
+            await asyncio.gather(self._handler, return_exceptions=True)
+            self._handler = None
+        if was_leader and self.enabled:
+            # Hand over right away instead of making the next leader wait out the TTL
+            await self.release()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            await self._tick()
+
+    async def _tick(self):
+        try:
+            leading = await self.try_acquire()
+        except Exception as e:
+            logger.warning(f"Lease '{self.name}' renewal failed: {e}")
+            # Keep leading only while the last successful renewal is still valid
+            leading = self.is_leader and time.time() < self._expires_at
+        await self._set_leader(leading)
+
+    async def _set_leader(self, leading: bool):
+        if leading == self.is_leader:
+            return
+        self.is_leader = leading
+        callback = self.on_elected if leading else self.on_demoted
+        logger.info(f"Worker {self.holder} {'acquired' if leading else 'lost'} the '{self.name}' lease.")
+        if callback is not None:
+            previous = self._handler
+            if previous is not None and not previous.done():
+                # Lost the lease mid-election (or won it back mid-demotion): the older handler is stale
+                previous.cancel()
+            self._handler = asyncio.create_task(self._run_handler(callback, previous, leading))
+
+    async def _run_handler(self, callback: Callable[[], Awaitable[None]], previous: Optional[asyncio.Task], leading: bool):
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Lease '{self.name}' {'election' if leading else 'demotion'} handler failed: {e}")
+
+class EventBus:
+    """Cross-process event log backed by the stream_events table.
+
+    Appends are buffered and written in one transaction per flush. Every
+    worker tails the table and hands new rows to its local Publisher, so ids
+    are global and Last-Event-ID replay works on whichever worker a client
+    reconnects to.
+    """
+
+    def __init__(self, poll: float = EVENT_BUS_POLL, retention: int = EVENT_BUS_RETENTION):
+        self.poll = poll
+        self.retention = retention
+        self.last_id = 0
+        self._pending: List[Tuple[str, str]] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._writes = 0
+
+    def append(self, kind: str, msg: dict):
+        """Queues a message for the shared log; never blocks the caller."""
+        self._pending.append((kind, json.dumps(msg, separators=(",", ":"))))
+        if self._wake is not None:
+            self._wake.set()
+
+    async def start(self, on_event: Callable[[int, dict, bool], None],
+                    on_command: Callable[[dict], None], replay_size: int = 0):
+        """Loads the last `replay_size` events into the local replay buffer, then starts tailing."""
+        self._wake = asyncio.Event()
+        async with AsyncSessionLocal() as db:
+            self.last_id = await db.scalar(select(func.max(StreamEvent.id))) or 0
+            if replay_size:
+                recent = (await db.execute(
+                    select(StreamEvent.id, StreamEvent.payload)
+                    .where(StreamEvent.kind == "event")
+                    .order_by(StreamEvent.id.desc())
+                    .limit(replay_size)
+                )).all()
+                for event_id, payload in reversed(recent):
+                    on_event(event_id, json.loads(payload), True)
+        self._tasks = [
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._reader(on_event, on_command)),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Don't lose whatever was published during shutdown
+        await self._flush()
+
+    async def _writer(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                await self._flush()
+            except Exception as e:
+                logger.error(f"Event bus write failed: {e}")
+                await asyncio.sleep(self.poll)
+
+    async def _flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                insert(StreamEvent).returning(StreamEvent.id),
+                [{"kind": kind, "payload": payload} for kind, payload in batch]
+            )
+            newest = max(result.scalars().all())
+            self._writes += len(batch)
+            if self._writes >= self.retention // 10:
+                self._writes = 0
+                await db.execute(delete(StreamEvent).where(StreamEvent.id <= newest - self.retention))
+            await db.commit()
+
+    async def _reader(self, on_event: Callable[[int, dict, bool], None], on_command: Callable[[dict], None]):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    rows = (await db.execute(
+                        select(StreamEvent.id, StreamEvent.kind, StreamEvent.payload)
+                        .where(StreamEvent.id > self.last_id)
+                        .order_by(StreamEvent.id)
+                        .limit(1000)
+                    )).all()
+                for event_id, kind, payload in rows:
+                    self.last_id = event_id
+                    msg = json.loads(payload)
+                    if kind == "command":
+                        on_command(msg)
+                    else:
+                        on_event(event_id, msg, kind == "event")
+                if len(rows) == 1000:
+                    continue
+            except Exception as e:
+                logger.error(f"Event bus read failed: {e}")
+            await asyncio.sleep(self.poll)
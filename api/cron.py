@@ -0,0 +1,154 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Set
+
+from sqlalchemy import select, func
+
+from models import AsyncSessionLocal, Article
+from coordination import LeaderLease
+from news_feed import news_feed
+
+logger = logging.getLogger(__name__)
+
+# Time-boxed collect-and-summarize pass for serverless deployments (/api/cron)
+CRON_BUDGET = float(os.getenv("CRON_BUDGET", "45"))             # Seconds of work per call; keep below the function timeout
+CRON_RESERVE = float(os.getenv("CRON_RESERVE", "3"))            # Seconds kept free to finish and respond
+CRON_SOURCE_CHUNK = int(os.getenv("CRON_SOURCE_CHUNK", "6"))    # Sources fetched and committed per step
+CRON_SUMMARY_SCAN = 200                                         # Unsummarized rows considered per batch pick
+STEP_MARGIN = 1.5                                               # Next step must fit 1.5x the slowest so far
+
+_story_index_loaded = False
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.ends_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return self.ends_at - time.monotonic()
+
+def mark_stale(msg: dict):
+    """Keeps this instance's /api/news snapshot current for rows it changed itself."""
+    if "id" in msg:
+        news_feed.touch([msg["id"]])
+
+async def _publish(msg: dict):
+    mark_stale(msg)
+
+async def collect(deadline: Deadline, force: bool = False) -> Dict[str, Any]:
+    """Polls due sources (all of them with `force`) in committed chunks until time runs out.
+
+    Sources that were not reached keep their next_run_at, so the next call
+    picks them up first.
+    """
+    global _story_index_loaded
+    # Heavy modules (httpx pool, feedparser) load on the first pass, not at cold start
+    import scrapers
+    from ingest import load_story_index
+    from pipeline import run_pipeline
+    from sources import source_registry
+
+    if not _story_index_loaded:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(load_story_index)
+        _story_index_loaded = True
+    # Other instances may have polled since this one last ran
+    await source_registry.load()
+    due = list(source_registry.sources.values()) if force else source_registry.due()
+
+    polled, new_total, slowest = 0, 0, 0.0
+    for i in range(0, len(due), CRON_SOURCE_CHUNK):
+        if i and deadline.remaining() < slowest * STEP_MARGIN:
+            break
+        chunk = due[i:i + CRON_SOURCE_CHUNK]
+        started = time.monotonic()
+
+        result = await run_pipeline(chunk, _publish)
+        await scrapers.save_feed_cache()
+        for name, outcome in result.outcomes.items():
+            source_registry.record(name, outcome, result.new_by_source[name])
+        await source_registry.save(result.outcomes)
+
+        polled += len(chunk)
+        new_total += result.new_count
+        slowest = max(slowest, time.monotonic() - started)
+
+    return {"sources_polled": polled, "sources_remaining": len(due) - polled, "new_articles": new_total}
+
+async def _pending_count() -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count(Article.id)).where(Article.summary.is_(None)))
+
+async def summarize(deadline: Deadline) -> Dict[str, Any]:
+    """Summarizes pending articles one API batch at a time, most urgent first.
+
+    Every batch commits on its own, so a call that runs out of time only
+    drops the batch in flight; its articles stay pending for the next call.
+    """
+    from summary_service import SummarizationService, article_priority
+    from summarizer import BATCH_MAX_ARTICLES
+
+    service = SummarizationService(_publish, workers=0)
+    pending_before = await _pending_count()
+    attempted: Set[int] = set()
+    slowest, timed_out = 0.0, False
+    while True:
+        remaining = deadline.remaining()
+        if remaining <= 0 or (attempted and remaining < slowest * STEP_MARGIN):
+            timed_out = True
+            break
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Article.id, Article.source, Article.title, Article.severity)
+                .where(Article.summary.is_(None))
+                .order_by(Article.created_at.desc())
+                .limit(CRON_SUMMARY_SCAN)
+            )).all()
+        # Failed items stay NULL; don't retry them within the same pass
+        candidates = sorted((r for r in rows if r.id not in attempted),
+                            key=lambda r: article_priority(r.source, r.title, r.severity))
+        if not candidates:
+            break
+        batch = [r.id for r in candidates[:BATCH_MAX_ARTICLES]]
+        attempted.update(batch)
+
+        started = time.monotonic()
+        try:
+            deferred = await asyncio.wait_for(service.summarize_many(batch), timeout=remaining)
+        except asyncio.TimeoutError:
+            timed_out = True
+            break
+        attempted.difference_update(a.id for a in deferred)
+        slowest = max(slowest, time.monotonic() - started)
+
+    pending = await _pending_count()
+    return {"summarized": pending_before - pending, "pending_summaries": pending, "summaries_timed_out": timed_out and pending > 0}
+
+async def run_pass(budget: float = CRON_BUDGET, collect_sources: bool = True, summarize_articles: bool = True,
+                   force: bool = False) -> Dict[str, Any]:
+    """One bounded, resumable pass. Concurrent calls are serialized through the 'cron' lease."""
+    started = time.monotonic()
+    lease = LeaderLease(name="cron", ttl=budget + 60, enabled=True)
+    if not await lease.try_acquire():
+        return {"status": "busy", "detail": "Another pass is still running."}
+
+    deadline = Deadline(budget - CRON_RESERVE)
+    result: Dict[str, Any] = {}
+    try:
+        if collect_sources:
+            result.update(await collect(deadline, force))
+        if summarize_articles:
+            result.update(await summarize(deadline))
+            # Spare time goes to indexing rows that predate the entity extractor
+            if deadline.remaining() > 0:
+                from entities import backfill
+                await backfill(deadline.remaining())
+    finally:
+        await lease.release()
+
+    unfinished = result.get("sources_remaining") or result.get("summaries_timed_out")
+    result["status"] = "partial" if unfinished else "complete"
+    result["elapsed"] = round(time.monotonic() - started, 2)
+    logger.info(f"Cron pass {result['status']}: {result}")
+    return result
@@ -0,0 +1,135 @@
+import os
+import re
+import random
+import struct
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Kept free of app imports so parse workers can compute signatures
+logger = logging.getLogger(__name__)
+
+# MinHash / LSH parameters: 32 bands x 4 rows catches pairs above ~0.42 Jaccard
+NUM_PERM = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+SIMILARITY_THRESHOLD = float(os.getenv("CLUSTER_SIMILARITY_THRESHOLD", "0.5"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: signatures are persisted and must be comparable across processes
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+_SIG_FORMAT = f"<{NUM_PERM}I"
+
+_WORD_RE = re.compile(r'[a-z0-9]+(?:[-.][a-z0-9]+)*')
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed word k-grams of the lowercased text."""
+    words = _WORD_RE.findall((text or '').lower())
+    if len(words) < k:
+        words = words + [''] * (k - len(words))
+    grams = {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), 'little') for g in grams}
+
+def minhash(text: str) -> bytes:
+    """Packed MinHash signature of a story (title + content)."""
+    hashes = shingles(text)
+    signature = [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+    return struct.pack(_SIG_FORMAT, *signature)
+
+def story_text(title: str, content: str) -> str:
+    return f"{title or ''} {content or ''}"
+
+def unpack(signature: bytes) -> Tuple[int, ...]:
+    return struct.unpack(_SIG_FORMAT, signature)
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+def _band_keys(sig: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    return [(band, hash(sig[band * LSH_ROWS:(band + 1) * LSH_ROWS])) for band in range(LSH_BANDS)]
+
+class StoryIndex:
+    """Incremental in-memory LSH index assigning articles to story clusters.
+
+    Each band of the signature is hashed into a bucket; only articles sharing
+    a bucket are compared, so assignment cost does not grow with the window.
+    A cluster's id is the id of its first article.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.buckets: Dict[Tuple[int, int], List[int]] = {}
+        self.signatures: Dict[int, Tuple[int, ...]] = {}
+        self.clusters: Dict[int, int] = {}
+        self.created: Dict[int, datetime] = {}
+
+    def clear(self):
+        self.buckets.clear()
+        self.signatures.clear()
+        self.clusters.clear()
+        self.created.clear()
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def add(self, article_id: int, signature: bytes, cluster_id: int, created_at: Optional[datetime] = None):
+        # Re-adding replaces the entry, so buckets never hold an id twice
+        if article_id in self.signatures:
+            self.remove([article_id])
+        sig = unpack(signature)
+        self.signatures[article_id] = sig
+        self.clusters[article_id] = cluster_id
+        if created_at is not None:
+            self.created[article_id] = created_at.replace(tzinfo=None)
+        for key in _band_keys(sig):
+            self.buckets.setdefault(key, []).append(article_id)
+
+    def match(self, signature: bytes) -> Tuple[Optional[int], float]:
+        """(cluster, similarity) of the most similar indexed article above the threshold, else (None, 0)."""
+        sig = unpack(signature)
+        candidates: Set[int] = set()
+        for key in _band_keys(sig):
+            candidates.update(self.buckets.get(key, ()))
+        best_id, best_score = None, self.threshold
+        for candidate in candidates:
+            score = similarity(sig, self.signatures[candidate])
+            if score >= best_score:
+                best_id, best_score = candidate, score
+        return (self.clusters[best_id], best_score) if best_id is not None else (None, 0.0)
+
+    def find_cluster(self, signature: bytes) -> Optional[int]:
+        """Cluster of the most similar indexed article above the threshold."""
+        return self.match(signature)[0]
+
+    def assign(self, article_id: int, signature: bytes, created_at: Optional[datetime] = None) -> int:
+        cluster_id = self.find_cluster(signature) or article_id
+        self.add(article_id, signature, cluster_id, created_at)
+        return cluster_id
+
+    def remove(self, article_ids: Iterable[int]):
+        doomed = set(article_ids) & set(self.signatures)
+        if not doomed:
+            return
+        for article_id in doomed:
+            for key in _band_keys(self.signatures[article_id]):
+                bucket = self.buckets.get(key)
+                if bucket is not None:
+                    bucket.remove(article_id)
+                    if not bucket:
+                        del self.buckets[key]
+            del self.signatures[article_id]
+            del self.clusters[article_id]
+            self.created.pop(article_id, None)
+
+    def prune(self, before: datetime):
+        """Drops articles created before the retention cutoff."""
+        before = before.replace(tzinfo=None)
+        self.remove([i for i, created in self.created.items() if created < before])
@@ -0,0 +1,238 @@
+import os
+import re
+import asyncio
+import logging
+import ipaddress
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException
+from sqlalchemy import select, update, func, tuple_, or_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import AsyncSessionLocal, Article, ArticleEntity
+from schemas import LIST_FIELDS, encode_cursor, decode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Bump when the patterns below change; the backfill then re-extracts older rows
+EXTRACTOR_VERSION = 1
+ENTITY_BACKFILL_BATCH = int(os.getenv("ENTITY_BACKFILL_BATCH", "500"))  # Articles re-scanned per commit
+
+# Known vendors and products: canonical name -> extra spellings
+VENDORS = {
+    "Microsoft": [], "Google": [], "Apple": [], "Cisco": [], "Fortinet": [], "Palo Alto Networks": ["Palo Alto"],
+    "Ivanti": [], "Citrix": [], "VMware": [], "Oracle": [], "SAP": [], "Adobe": [], "Atlassian": [],
+    "Juniper": [], "SonicWall": [], "Check Point": [], "F5": [], "Zyxel": [], "Progress Software": [],
+    "SolarWinds": [], "CrowdStrike": [], "Okta": [], "Cloudflare": [], "Amazon": ["AWS"], "Meta": [],
+    "Mozilla": [], "Samsung": [], "Qualcomm": [], "AMD": [], "Nvidia": [], "Linux": [],
+    "Broadcom": [], "Veeam": [], "Synology": [], "QNAP": [], "D-Link": [], "TP-Link": [], "Netgear": [],
+    "Siemens": [], "Schneider Electric": [], "Jenkins": [], "GitLab": [], "GitHub": [], "WordPress": [],
+}
+PRODUCTS = {
+    "Windows": [], "Exchange Server": ["Microsoft Exchange"], "SharePoint": [], "Outlook": [], "Microsoft Office": [],
+    "Azure": [], "Chrome": [], "Android": [], "iOS": [], "macOS": [], "Safari": [], "Firefox": [],
+    "FortiOS": [], "FortiGate": [], "FortiManager": [], "PAN-OS": [], "GlobalProtect": [],
+    "Connect Secure": ["Pulse Connect Secure"], "NetScaler": ["Citrix ADC"], "vCenter": [], "ESXi": [],
+    "Confluence": [], "Jira": [], "MOVEit": [], "BIG-IP": [], "Active Directory": [], "Kubernetes": [],
+    "Docker": [], "OpenSSH": [], "OpenSSL": [], "Apache Struts": [], "Log4j": ["Log4Shell"], "ScreenConnect": [],
+}
+
+# Precompiled once; IOCs in reports are often defanged (hxxp, example[.]com).
+# Patterns start with a plain character class where possible so the regex
+# engine can skip ahead instead of trying every position of a long article.
+_REFANG_RE = re.compile(r"\[\.\]|\(\.\)|\{\.\}|\[dot\]|\(dot\)", re.IGNORECASE)
+CVE_RE = re.compile(r"(?i:cve)-(\d{4})-(\d{4,7})(?!\d)")
+IPV4_RE = re.compile(r"(?<![\d.])(?:(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)\.){3}(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)(?!\.?\d)")
+HASH_RE = re.compile(r"\b(?:[a-fA-F0-9]{64}|[a-fA-F0-9]{40}|[a-fA-F0-9]{32})\b")
+# Lower-case only: prose like "ASP.NET" or "Node.js" is not an indicator
+DOMAIN_RE = re.compile(r"(?<![\w@.-])((?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+([a-z]{2,12}))(?![\w-]|\.[a-z0-9])")
+_NAMES = {alias.lower(): ("vendor", name) for name, aliases in VENDORS.items() for alias in [name] + aliases}
+_NAMES.update({alias.lower(): ("product", name) for name, aliases in PRODUCTS.items() for alias in [name] + aliases})
+# Case-sensitive so "check point" or "windows" in plain prose don't count; the
+# left word boundary is checked per hit (a lookbehind would disable the skip-ahead)
+NAME_RE = re.compile("(?:" + "|".join(
+    re.escape(alias) for alias in sorted({a for table in (VENDORS, PRODUCTS) for n, aliases in table.items() for a in [n] + aliases},
+                                         key=len, reverse=True)
+) + r")(?![\w-])")
+MIN_HASH_LENGTH = 32
+
+# TLDs worth indexing; anything else is usually a file name or abbreviation
+DOMAIN_TLDS = {
+    "com", "net", "org", "info", "biz", "io", "co", "me", "cc", "tv", "app", "dev", "xyz", "top", "online", "site",
+    "club", "live", "shop", "store", "icu", "buzz", "pw", "su", "ru", "cn", "ir", "kp", "ua", "by", "tk", "ml", "ga",
+    "cf", "gq", "ws", "in", "uk", "de", "fr", "nl", "br", "jp", "kr", "hk", "tw", "vn", "id", "eu", "us", "onion",
+}
+# Links to these appear in nearly every post (share buttons, embeds)
+IGNORED_DOMAINS = {
+    "twitter.com", "x.com", "t.co", "facebook.com", "linkedin.com", "youtube.com", "instagram.com", "reddit.com",
+    "bit.ly", "google.com", "feedburner.com", "wordpress.com", "gravatar.com", "example.com",
+}
+
+KINDS = ["cve", "vendor", "product", "ip", "domain", "md5", "sha1", "sha256"]
+_HASH_KINDS = {32: "md5", 40: "sha1", 64: "sha256"}
+
+def _domain(url: Optional[str]) -> str:
+    host = (urlsplit(url or "").hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+def extract_entities(*texts: Optional[str], url: Optional[str] = None) -> Set[Tuple[str, str]]:
+    """(kind, value) pairs mentioned in the given texts; `url` is the article's own link, never an indicator."""
+    text = "\n".join(t for t in texts if t)
+    if not text:
+        return set()
+    if "[" in text or "(" in text or "{" in text:
+        text = _REFANG_RE.sub(".", text)
+    found: Set[Tuple[str, str]] = set()
+    for year, number in CVE_RE.findall(text):
+        found.add(("cve", f"CVE-{year}-{number}"))
+
+    # IPs and domains need a dot and hashes a long run, so only those words are scanned
+    tokens = text.split()
+    dotted = " ".join(t for t in tokens if "." in t)
+    long_words = " ".join(t for t in tokens if len(t) >= MIN_HASH_LENGTH)
+    for match in HASH_RE.findall(long_words):
+        # All-digit runs are ids and timestamps, not digests
+        if not match.isdigit():
+            found.add((_HASH_KINDS[len(match)], match.lower()))
+    for match in IPV4_RE.findall(dotted):
+        if ipaddress.ip_address(match).is_global:
+            found.add(("ip", match))
+    own = _domain(url)
+    for match, tld in DOMAIN_RE.findall(dotted):
+        domain = match[4:] if match.startswith("www.") else match
+        if tld in DOMAIN_TLDS and domain != own and domain not in IGNORED_DOMAINS:
+            found.add(("domain", domain))
+
+    for match in NAME_RE.finditer(text):
+        start = match.start()
+        if start and (text[start - 1].isalnum() or text[start - 1] in "_-"):
+            continue
+        found.add(_NAMES[match.group().lower()])
+    return found
+
+def parse_entity(raw: str) -> Tuple[str, str]:
+    """Normalizes a user-supplied id ("cve-2024-3400", "Fortinet", "1.2.3[.]4") to its stored (kind, value)."""
+    value = _REFANG_RE.sub(".", raw.strip())
+    match = CVE_RE.fullmatch(value)
+    if match:
+        return "cve", f"CVE-{match.group(1)}-{match.group(2)}"
+    if IPV4_RE.fullmatch(value):
+        return "ip", value
+    if HASH_RE.fullmatch(value) and not value.isdigit():
+        return _HASH_KINDS[len(value)], value.lower()
+    if value.lower() in _NAMES:
+        return _NAMES[value.lower()]
+    if DOMAIN_RE.fullmatch(value.lower()):
+        domain = value.lower()
+        return "domain", domain[4:] if domain.startswith("www.") else domain
+    raise HTTPException(status_code=404, detail=f"Not a recognized CVE, IOC or vendor: {raw}")
+
+def record_entities(db: Session, rows: List[Dict[str, Any]]):
+    """Indexes the entities of stored articles (dicts with id, title, content, summary, url, created_at).
+
+    Re-recording is harmless, so the summarizer can add what only its summary mentions.
+    """
+    links = [
+        {"entity": value, "article_id": row["id"], "kind": kind, "created_at": row.get("created_at")}
+        for row in rows
+        for kind, value in extract_entities(row.get("title"), row.get("content"), row.get("summary"), url=row.get("url"))
+    ]
+    if links:
+        # executemany on one cached statement; per-chunk VALUES lists would be recompiled every time
+        db.execute(insert(ArticleEntity).on_conflict_do_nothing(index_elements=["entity", "article_id"]), links)
+
+def backfill_batch(db: Session, after_id: int = 0) -> Optional[int]:
+    """Extracts one batch of articles indexed by an older extractor (or none); returns the last id or None when done."""
+    rows = db.execute(
+        select(Article.id, Article.title, Article.content, Article.summary, Article.url, Article.created_at)
+        .where(Article.id > after_id)
+        .where(or_(Article.entities_version.is_(None), Article.entities_version < EXTRACTOR_VERSION))
+        .order_by(Article.id)
+        .limit(ENTITY_BACKFILL_BATCH)
+    ).mappings().all()
+    if not rows:
+        return None
+    record_entities(db, rows)
+    db.execute(update(Article).where(Article.id.in_([r["id"] for r in rows])).values(entities_version=EXTRACTOR_VERSION))
+    db.commit()
+    return rows[-1]["id"]
+
+async def backfill(budget: Optional[float] = None) -> int:
+    """Indexes stored articles that predate the extractor, one committed batch at a time.
+
+    Yields to the event loop between batches; with `budget`, stops after that
+    many seconds and the next call carries on.
+    """
+    loop = asyncio.get_running_loop()
+    ends_at = None if budget is None else loop.time() + budget
+    last_id, done = 0, 0
+    while ends_at is None or loop.time() < ends_at:
+        async with AsyncSessionLocal() as db:
+            next_id = await db.run_sync(backfill_batch, last_id)
+        if next_id is None:
+            break
+        done += 1
+        last_id = next_id
+        await asyncio.sleep(0)
+    if done:
+        logger.info(f"Entity index backfilled up to article {last_id}.")
+    return last_id
+
+async def top_entities(db: AsyncSession, days: int, kind: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+    """Most-mentioned entities (by article count) over the last `days` days."""
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"kind must be one of: {', '.join(KINDS)}")
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    count = func.count().label("count")
+    # Constraining kind (all of them by default) keeps the scan on the covering (kind, created_at, entity) index
+    rows = (await db.execute(
+        select(ArticleEntity.entity, ArticleEntity.kind, count)
+        .where(ArticleEntity.kind.in_([kind] if kind else KINDS))
+        .where(ArticleEntity.created_at >= since)
+        .group_by(ArticleEntity.kind, ArticleEntity.entity)
+        .order_by(count.desc(), ArticleEntity.entity)
+        .limit(limit)
+    )).all()
+    return {
+        "window_days": days,
+        "kind": kind,
+        "items": [{"entity": entity, "kind": k, "count": n} for entity, k, n in rows],
+    }
+
+async def entity_articles(db: AsyncSession, raw: str, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Articles mentioning one entity, newest first, keyset-paginated like /api/history."""
+    kind, value = parse_entity(raw)
+    stats = (await db.execute(
+        select(func.count(), func.min(ArticleEntity.created_at), func.max(ArticleEntity.created_at))
+        .where(ArticleEntity.entity == value)
+    )).one()
+
+    query = (
+        select(*[Article.__table__.c[name] for name in LIST_FIELDS])
+        .join(ArticleEntity, ArticleEntity.article_id == Article.id)
+        .where(ArticleEntity.entity == value)
+    )
+    if cursor:
+        created_at, article_id = decode_cursor(cursor)
+        query = query.where(tuple_(ArticleEntity.created_at, ArticleEntity.article_id) < (created_at, article_id))
+    rows = (await db.execute(
+        query.order_by(ArticleEntity.created_at.desc(), ArticleEntity.article_id.desc()).limit(limit + 1)
+    )).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return {
+        "entity": value,
+        "kind": kind,
+        "count": stats[0],
+        "first_seen": stats[1],
+        "last_seen": stats[2],
+        "items": [dict(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
@@ -0,0 +1,144 @@
+import os
+import json
+import asyncio
+import itertools
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Stream tuning
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "256"))          # Frames buffered per subscriber
+SSE_REPLAY_SIZE = int(os.getenv("SSE_REPLAY_SIZE", "1000"))        # Article events kept for Last-Event-ID replay
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))            # Seconds between keep-alive pings
+SSE_SLOW_POLICY = os.getenv("SSE_SLOW_POLICY", "drop_oldest")      # "drop_oldest" or "disconnect"
+STATUS_COALESCE = float(os.getenv("SSE_STATUS_COALESCE", "0.25"))  # Seconds to merge status updates
+SSE_RETRY_MS = 5000                                                # Client reconnect delay hint
+
+def encode_frame(event_id: int, msg: dict) -> bytes:
+    """Wire-format SSE frame, built once and shared by every subscriber."""
+    return f"id: {event_id}\ndata: {json.dumps(msg, separators=(',', ':'))}\n\n".encode()
+
+class Subscriber:
+    """One stream connection: a bounded queue plus a close signal."""
+
+    def __init__(self, maxsize: int = SSE_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.closed = False
+        self.dropped = 0
+
+    def offer(self, frame: bytes, policy: Optional[str] = None):
+        """Non-blocking enqueue; slow consumers lose old frames or get disconnected."""
+        if self.closed:
+            return
+        policy = policy or SSE_SLOW_POLICY
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            if policy == "disconnect":
+                self.close()
+                return
+            self.queue.get_nowait()
+            self.queue.put_nowait(frame)
+            self.dropped += 1
+
+    def close(self):
+        self.closed = True
+        # Wake the reader; make room for the sentinel if needed
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[bytes]:
+        """Next frame, or None once the subscriber has been closed."""
+        if self.closed and self.queue.empty():
+            return None
+        return await self.queue.get()
+
+class Publisher:
+    """SSE fan-out: encode once, bounded per-subscriber queues, replay ring buffer.
+
+    Status updates are coalesced so bursts (e.g. per-article progress) cost
+    subscribers one frame per STATUS_COALESCE window. With a `bus`, messages
+    go through the shared log and come back via deliver() in every process.
+    """
+
+    def __init__(self, replay_size: int = SSE_REPLAY_SIZE, bus=None):
+        self.bus = bus
+        self.listeners: List[Callable[[dict], None]] = []
+        self.subscribers: Set[Subscriber] = set()
+        self._seq = itertools.count(1)
+        self._last_id = 0
+        self._history: Deque[Tuple[int, bytes]] = deque(maxlen=replay_size)
+        self._pending_status: Optional[dict] = None
+        self._status_timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(s.queue.qsize() for s in self.subscribers)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """Registers a connection, replaying article events after `last_event_id`."""
+        sub = Subscriber()
+        if last_event_id:
+            self._replay(sub, last_event_id)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self.subscribers.discard(sub)
+
+    def _replay(self, sub: Subscriber, last_event_id: str):
+        try:
+            last = int(last_event_id)
+        except ValueError:
+            return
+        if last >= self._last_id:
+            return
+        oldest = self._history[0][0] if self._history else self._last_id + 1
+        missed = [frame for event_id, frame in self._history if event_id > last]
+        # Missed more than the buffer holds, or more than the subscriber's queue
+        # takes (replay would silently drop or disconnect): tell the client to refetch
+        if last < oldest - 1 or len(missed) >= sub.queue.maxsize:
+            sub.offer(encode_frame(self._last_id, {"resync": True}))
+            return
+        for frame in missed:
+            sub.offer(frame)
+
+    async def publish(self, msg: dict):
+        if set(msg) == {"status_update"}:
+            self._coalesce_status(msg)
+            return
+        self._emit(msg, replayable=True)
+
+    def _coalesce_status(self, msg: dict):
+        self._pending_status = msg
+        if self._status_timer is None:
+            self._status_timer = asyncio.get_running_loop().call_later(STATUS_COALESCE, self._flush_status)
+
+    def _flush_status(self):
+        self._status_timer = None
+        msg, self._pending_status = self._pending_status, None
+        if msg is not None:
+            self._emit(msg, replayable=False)
+
+    def _emit(self, msg: dict, replayable: bool):
+        if self.bus is not None:
+            self.bus.append("event" if replayable else "status", msg)
+        else:
+            self.deliver(next(self._seq), msg, replayable)
+
+    def deliver(self, event_id: int, msg: dict, replayable: bool):
+        """Fans one event out to this process's listeners and subscribers."""
+        for listener in self.listeners:
+            listener(msg)
+        self._last_id = event_id
+        frame = encode_frame(event_id, msg)
+        if replayable:
+            self._history.append((event_id, frame))
+        for sub in list(self.subscribers):
+            sub.offer(frame)
+            if sub.closed:
+                self.subscribers.discard(sub)
+                logger.warning("Disconnected slow SSE subscriber.")
@@ -0,0 +1,89 @@
+import os
+import sys
+import logging
+
+from fastapi import FastAPI, Depends, Request, HTTPException, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+# Add current directory to path for relative imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Serverless entry point (Vercel: api.index:app).
+# No scheduler, leader election or event bus: collection and summarization run
+# in bounded /api/cron passes. Scrapers, feedparser and the Gemini client are
+# imported on the first pass instead of at cold start.
+
+# Function sandboxes often lack the shared memory a process pool needs
+os.environ.setdefault("PARSE_EXECUTOR", "thread")
+
+from models import init_db
+from news_feed import news_feed
+from routes import router
+import metrics
+import cron
+
+# Initialize Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Other instances change rows without telling this one; re-read today's feed this often
+news_feed.max_age = float(os.getenv("SERVERLESS_SNAPSHOT_MAX_AGE", "60"))
+
+_db_ready = False
+
+def ensure_db():
+    """Creates/migrates the schema once per instance, on its first request."""
+    global _db_ready
+    if not _db_ready:
+        init_db()
+        _db_ready = True
+
+def check_cron_secret(request: Request):
+    """Vercel sends `Authorization: Bearer $CRON_SECRET` when the variable is set."""
+    secret = os.getenv("CRON_SECRET")
+    if secret and request.headers.get("authorization") != f"Bearer {secret}":
+        raise HTTPException(status_code=401, detail="Invalid cron secret")
+
+app = FastAPI(title="Cyber News Aggregator API", dependencies=[Depends(ensure_db)])
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(metrics.RequestMetricsMiddleware)
+app.include_router(router)
+
+@app.get("/api/health")
+def health_check():
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    return {
+        "status": "ok",
+        "gemini_active": gemini_key is not None and len(gemini_key) > 5,
+        "mode": "serverless"
+    }
+
+@app.get("/api/cron", dependencies=[Depends(check_cron_secret)])
+async def cron_trigger():
+    """Collects due sources and summarizes pending articles within CRON_BUDGET seconds.
+
+    Returns "partial" when time ran out; the next call resumes from the
+    persisted source schedule and the still-unsummarized rows.
+    """
+    return await cron.run_pass()
+
+@app.post("/api/refresh")
+async def trigger_refresh():
+    # Runs in the request: background tasks may be frozen once the response is sent
+    return await cron.run_pass(summarize_articles=False, force=True)
+
+@app.post("/api/summarize-batch")
+async def trigger_summarize():
+    return await cron.run_pass(collect_sources=False)
+
+@app.get("/api/stream")
+async def message_stream():
+    """No live stream without a long-running process; 204 tells EventSource to stop reconnecting."""
+    return Response(status_code=204)
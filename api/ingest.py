@@ -0,0 +1,216 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterable
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from models import Article, ArticleSignature
+from dedupe import StoryIndex, minhash, story_text
+from analytics import record_articles
+from entities import record_entities, EXTRACTOR_VERSION
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Query-string keys that only track the click and never change the article
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    '_hsenc', '_hsmi', 'ref', 'ref_src', 'cmpid', 'ncid', 'sr_share'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# Stay well below SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+# Window of articles kept in the near-duplicate index (matches retention)
+CLUSTER_WINDOW_DAYS = 7
+
+# Near-duplicate story index shared by ingest and the API
+story_index = StoryIndex()
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an article URL used for deduplication."""
+    url = (url or '').strip()
+    if not url:
+        return url
+    parts = urlsplit(url)
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    path = parts.path.rstrip('/') if parts.path not in ('', '/') else ''
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+def _chunks(items: List[Any], size: int = CHUNK_SIZE) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def article_to_dict(article: Any) -> Dict[str, Any]:
+    """Wire format pushed to the UI for a single article."""
+    return {
+        "id": article.id,
+        "title": article.title,
+        "url": article.url,
+        "summary": article.summary,
+        "source": article.source,
+        "category": article.category,
+        "severity": article.severity,
+        "published_at": article.published_at.isoformat() if article.published_at else None,
+        "cluster_id": article.cluster_id or article.id
+    }
+
+def load_story_index(db: Session):
+    """Rebuilds the in-memory story index from persisted signatures.
+
+    Runs on every (re-)election, so the index is emptied first. Articles in
+    the window that predate clustering are signed and assigned here.
+    """
+    story_index.clear()
+    since = datetime.now(timezone.utc) - timedelta(days=CLUSTER_WINDOW_DAYS)
+    rows = db.execute(
+        select(ArticleSignature.article_id, ArticleSignature.signature,
+               ArticleSignature.cluster_id, ArticleSignature.created_at)
+        .where(ArticleSignature.created_at >= since)
+        .order_by(ArticleSignature.article_id)
+    )
+    for article_id, signature, cluster_id, created_at in rows:
+        story_index.add(article_id, signature, cluster_id, created_at)
+
+    unsigned = db.execute(
+        select(Article.id, Article.title, Article.content, Article.created_at)
+        .outerjoin(ArticleSignature, ArticleSignature.article_id == Article.id)
+        .where(Article.created_at >= since, ArticleSignature.article_id.is_(None))
+        .order_by(Article.id)
+    ).all()
+    if unsigned:
+        assign_clusters(db, [
+            {"id": i, "title": t, "content": c, "created_at": created}
+            for i, t, c, created in unsigned
+        ])
+        db.commit()
+    logger.info(f"Story index loaded: {len(story_index)} articles ({len(unsigned)} backfilled).")
+
+# Assignments wait in Session.info until the rows they describe are committed
+_PENDING_KEY = "story_index_pending"
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_clusters(db: Session):
+    for article_id, signature, cluster_id, created_at in db.info.pop(_PENDING_KEY, []):
+        story_index.add(article_id, signature, cluster_id, created_at)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_clusters(db: Session):
+    # The rowids may be reused by other articles; they must never reach the index
+    db.info.pop(_PENDING_KEY, None)
+
+def assign_clusters(db: Session, rows: List[Dict[str, Any]]):
+    """Assigns freshly inserted rows to story clusters and persists their signatures.
+
+    The shared story index only learns about the rows once the caller's
+    transaction commits; until then they are matched through a per-transaction
+    overlay so duplicates within the same transaction still cluster together.
+    """
+    pending = db.info.setdefault(_PENDING_KEY, [])
+    overlay = StoryIndex(story_index.threshold)
+    for entry in pending:
+        overlay.add(*entry)
+
+    signatures, updates = [], []
+    for row in rows:
+        signature = row.get("signature") or minhash(story_text(row["title"], row["content"]))
+        (committed, committed_score), (staged, staged_score) = story_index.match(signature), overlay.match(signature)
+        cluster_id = (committed if committed_score >= staged_score else staged) or row["id"]
+        overlay.add(row["id"], signature, cluster_id, row["created_at"])
+        pending.append((row["id"], signature, cluster_id, row["created_at"]))
+        row["cluster_id"] = cluster_id
+        if cluster_id != row["id"]:
+            metrics.INGEST_CLUSTERED.inc()
+        signatures.append({
+            "article_id": row["id"], "cluster_id": cluster_id,
+            "signature": signature, "created_at": row["created_at"]
+        })
+        updates.append({"id": row["id"], "cluster_id": cluster_id})
+    for chunk in _chunks(signatures):
+        db.execute(insert(ArticleSignature).values(chunk).on_conflict_do_nothing(index_elements=["article_id"]))
+    if updates:
+        db.execute(update(Article), updates)
+
+def ingest_articles(db: Session, scraped: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bulk-inserts scraped articles, skipping duplicates.
+
+    URLs are normalized and deduplicated within the batch, checked against the
+    table with one set query per chunk, and the remainder inserted with
+    INSERT ... ON CONFLICT DO NOTHING RETURNING. The caller commits and
+    publishes the returned rows.
+    """
+    # Dedupe inside the batch (first occurrence wins)
+    candidates: Dict[str, Dict[str, Any]] = {}
+    raw_urls: Dict[str, str] = {}
+    invalid = 0
+    for item in scraped:
+        try:
+            url = normalize_url(item.get('url', ''))
+        except ValueError as e:
+            # e.g. "http://[broken/x": drop the item, not the batch
+            logger.warning(f"Dropping {item.get('source')} item with invalid URL {item.get('url')!r}: {e}")
+            invalid += 1
+            continue
+        if not url or url in candidates:
+            continue
+        candidates[url] = item
+        raw_urls[url] = item.get('url', '')
+
+    if not candidates:
+        metrics.INGEST_ITEMS.inc(invalid, result="invalid")
+        return []
+
+    # Rows stored before normalization may still carry the raw URL
+    lookup = list(set(candidates) | set(raw_urls.values()))
+    existing = set()
+    for chunk in _chunks(lookup):
+        existing.update(db.execute(select(Article.url).where(Article.url.in_(chunk))).scalars())
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "title": item['title'],
+            "url": url,
+            "content": item['content'],
+            "summary": None,
+            "source": item['source'],
+            "category": "General",
+            "severity": "Medium",
+            "published_at": item['published_at'],
+            "created_at": now,
+            "entities_version": EXTRACTOR_VERSION
+        }
+        for url, item in candidates.items()
+        if url not in existing and raw_urls[url] not in existing
+    ]
+
+    inserted: List[Dict[str, Any]] = []
+    for chunk in _chunks(rows):
+        stmt = (
+            insert(Article)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=[Article.url])
+            .returning(Article.id, Article.url)
+        )
+        ids = {url: id_ for id_, url in db.execute(stmt)}
+        new_rows = [dict(row, id=ids[row["url"]], signature=candidates[row["url"]].get("signature"))
+                    for row in chunk if row["url"] in ids]
+        assign_clusters(db, new_rows)
+        record_articles(db, new_rows)
+        record_entities(db, new_rows)
+        for row in new_rows:
+            row.pop("signature")
+            inserted.append(article_to_dict(Article(**row)))
+
+    metrics.INGEST_ITEMS.inc(len(inserted), result="new")
+    metrics.INGEST_ITEMS.inc(len(scraped) - len(inserted) - invalid, result="duplicate")
+    metrics.INGEST_ITEMS.inc(invalid, result="invalid")
+    logger.info(f"Ingest: {len(scraped)} scraped, {len(candidates)} unique, {len(inserted)} new.")
+    return inserted
@@ -1,49 +1,56 @@
 import os
 import sys
-import json
 import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Any, Dict, List, Optional, Set
 
-from fastapi import FastAPI, Depends, BackgroundTasks, Request, HTTPException
+from fastapi import FastAPI, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from sqlalchemy.orm import Session
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sse_starlette.sse import EventSourceResponse
 
 # Add current directory to path for relative imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from models import SessionLocal, Article, init_db, get_db
+from models import AsyncSessionLocal, SessionLocal, async_engine, init_db
 import scrapers
-from summarizer import summarize_article
+from ingest import story_index, load_story_index
+from pipeline import run_pipeline
+from news_feed import news_feed
+from summary_service import SummarizationService, article_priority
+from events import Publisher, SSE_HEARTBEAT, SSE_RETRY_MS, SSE_REPLAY_SIZE
+from coordination import COORDINATION, LeaderLease, EventBus
+import summary_cache
+import analytics
+import entities
+import retention
+from sources import SOURCE_TICK, source_registry
+import metrics
+from profiling import instrumented
+from routes import router
 
 # Initialize Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Simple SSE Publisher
-class Publisher:
-    def __init__(self):
-        self.subscribers: List[asyncio.Queue] = []
+# With several workers/replicas, events travel through the shared DB so every stream sees them
+event_bus = EventBus() if COORDINATION == "sqlite" else None
+publisher = Publisher(bus=event_bus)
 
-    async def subscribe(self) -> asyncio.Queue:
-        queue = asyncio.Queue()
-        self.subscribers.append(queue)
-        return queue
+def mark_article_stale(msg: dict):
+    """Article events (from any worker) invalidate that row in the /api/news snapshot."""
+    if "id" in msg:
+        news_feed.touch([msg["id"]])
 
-    def unsubscribe(self, queue: asyncio.Queue):
-        if queue in self.subscribers:
-            self.subscribers.remove(queue)
+publisher.listeners.append(mark_article_stale)
 
-    async def publish(self, msg: dict):
-        msg_str = json.dumps(msg)
-        for queue in self.subscribers:
-            await queue.put(msg_str)
+summary_service = SummarizationService(publisher.publish)
 
-publisher = Publisher()
+metrics.SUMMARY_BACKLOG.callback = lambda: {(): summary_service.queue.qsize() if summary_service.queue else 0}
+metrics.SSE_SUBSCRIBERS.callback = lambda: {(): len(publisher.subscribers)}
+metrics.SSE_QUEUE_DEPTH.callback = lambda: {(): publisher.queue_depth}
 
 # Initialize FastAPI app
 app = FastAPI(title="Cyber News Aggregator API")
@@ -56,129 +63,162 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.RequestMetricsMiddleware)
+app.include_router(router)
 
 # Initialize Scheduler
 scheduler = AsyncIOScheduler()
 
 # Core Business Logic
-async def fetch_intel_cycle():
-    """Periodic task to collect news from all sources."""
-    db = SessionLocal()
+@instrumented
+async def fetch_intel_cycle(sources: Optional[List[Dict[str, Any]]] = None):
+    """Collects news from the given registry sources (default: all of them)."""
+    names = [s["name"] for s in sources] if sources is not None else list(source_registry.sources)
+    source_registry.in_flight.update(names)
     try:
-        await publisher.publish({"status_update": "Starting global intel collection..."})
-        logger.info("Starting global intel collection...")
-
-        # Get all articles from all sources
-        scraped_data = await scrapers.scrape_all_sources()
-        new_count = 0
-
-        for art_data in scraped_data:
-            existing = db.query(Article).filter(Article.url == art_data['url']).first()
-            if not existing:
-                new_art = Article(
-                    title=art_data['title'],
-                    url=art_data['url'],
-                    content=art_data['content'],
-                    summary=None,
-                    source=art_data['source'],
-                    category="General",
-                    severity="Medium",
-                    published_at=art_data['published_at']
-                )
-                db.add(new_art)
-                db.flush() # Get ID
-
-                # Immediate push to UI
-                article_json = {
-                    "id": new_art.id,
-                    "title": new_art.title,
-                    "url": new_art.url,
-                    "summary": None,
-                    "source": new_art.source,
-                    "category": "General",
-                    "severity": "Medium",
-                    "published_at": new_art.published_at.isoformat()
-                }
-                await publisher.publish(article_json)
-                new_count += 1
-
-        db.commit()
+        status = "Starting global intel collection..." if sources is None else f"Polling {', '.join(names)}..."
+        await publisher.publish({"status_update": status})
+        logger.info(status)
+
+        # Rows are committed and pushed to the UI batch by batch while slower feeds are still downloading
+        async def on_new(article_json: Dict[str, Any]):
+            await publisher.publish(article_json)
+            summary_service.enqueue(article_json["id"], article_priority(article_json["source"], article_json["title"]))
+
+        result = await run_pipeline(sources if sources is not None else list(source_registry.sources.values()), on_new)
+        new_count = result.new_count
+        await scrapers.save_feed_cache()
+
+        # Reschedule each source from what it just produced
+        for name, outcome in result.outcomes.items():
+            source_registry.record(name, outcome, result.new_by_source[name])
+        await source_registry.save(result.outcomes)
+
         logger.info(f"Intel collection complete. {new_count} new articles.")
         await publisher.publish({"status_update": f"Intel collection complete. Found {new_count} new items."})
 
-        # Auto-Cleanup: Older than 7 days
-        cutoff = datetime.now(timezone.utc) - timedelta(days=7)
-        deleted = db.query(Article).filter(Article.created_at < cutoff).delete()
-        db.commit()
-        if deleted > 0:
-            logger.info(f"Cleaned up {deleted} stale articles.")
-
     except Exception as e:
         logger.error(f"Error in fetch_intel_cycle: {e}")
         await publisher.publish({"status_update": f"Warning: Intel collection failed ({str(e)})"})
     finally:
-        db.close()
+        source_registry.in_flight.difference_update(names)
+
+async def poll_due_sources():
+    """Scheduler tick: polls only the sources whose adaptive interval has elapsed."""
+    due = source_registry.due()
+    if due:
+        await fetch_intel_cycle(due)
 
-async def summarization_cycle(limit: int = 5):
-    """Periodic task to process unsummarized articles."""
-    db = SessionLocal()
+@instrumented
+async def summarization_cycle(limit: int = 500):
+    """Periodic sweep that queues any unsummarized articles the workers have not seen."""
     try:
-        pending = db.query(Article).filter(Article.summary == None).order_by(Article.created_at.desc()).limit(limit).all()
-        if not pending:
-            return
-
-        for i, article in enumerate(pending):
-            await publisher.publish({"status_update": f"AI Analyzing {i+1}/{len(pending)}: {article.title[:30]}..."})
-            raw_output = await summarize_article(article.content)
-
-            # Parse Category and Severity
-            category, severity, summary = "General", "Medium", raw_output
-            if "CATEGORY:" in raw_output and "SUMMARY:" in raw_output:
-                try:
-                    parts = raw_output.split("SUMMARY:")
-                    summary = parts[1].strip()
-                    header = parts[0]
-                    if "CATEGORY:" in header:
-                        category = [l for l in header.split('\n') if "CATEGORY:" in l][0].replace("CATEGORY:", "").strip()
-                    if "SEVERITY:" in header:
-                        severity = [l for l in header.split('\n') if "SEVERITY:" in l][0].replace("SEVERITY:", "").strip()
-                except: pass
-
-            article.category = category
-            article.severity = severity
-            article.summary = summary
+        queued = await summary_service.enqueue_backlog(limit)
+        if queued:
+            logger.info(f"Queued {queued} pending articles for summarization.")
+        async with AsyncSessionLocal() as db:
+            await summary_cache.evict(db)
+    except Exception as e:
+        logger.error(f"Error in summarization_cycle: {e}")
+
+@instrumented
+async def retention_cycle():
+    """Archives articles past AUTO_DELETE_DAYS in bounded batches and reclaims the space."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention.RETENTION_DAYS)
+
+    def run():
+        # File I/O and compression stay off the event loop
+        with SessionLocal() as db:
+            moved = retention.run_retention(db, cutoff)
+            analytics.prune(db)
             db.commit()
+            return moved
 
-            # Push update to UI
-            await publisher.publish({
-                "id": article.id,
-                "title": article.title,
-                "url": article.url,
-                "summary": article.summary,
-                "source": article.source,
-                "category": article.category,
-                "severity": article.severity,
-                "published_at": article.published_at.isoformat()
-            })
-
-            # Respect Rate Limits (60s / 5 RPM = 12s delay)
-            if i < len(pending) - 1:
-                await asyncio.sleep(12)
+    try:
+        await asyncio.to_thread(run)
+        story_index.prune(cutoff)
+    except Exception as e:
+        logger.error(f"Error in retention_cycle: {e}")
 
+@instrumented
+async def entity_backfill_cycle():
+    """Indexes CVEs/IOCs of articles stored before the extractor (or an older version of it) existed."""
+    try:
+        await entities.backfill()
     except Exception as e:
-        logger.error(f"Error in summarization_cycle: {e}")
-    finally:
-        db.close()
+        logger.error(f"Error in entity_backfill_cycle: {e}")
+
+# Leader election: only one process scrapes and spends the Gemini quota.
+# LeaderLease runs these as tasks of their own, off the renewal loop.
+leader_tasks: Set[asyncio.Task] = set()  # Background jobs owned by the current leadership
+
+async def on_elected():
+    # Another worker may have ingested since startup
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(load_story_index)
+        await db.run_sync(analytics.backfill)
+    # Batched and yielding, so it runs alongside collection instead of delaying it
+    task = asyncio.create_task(entity_backfill_cycle())
+    leader_tasks.add(task)
+    task.add_done_callback(leader_tasks.discard)
+    await source_registry.load()
+    summary_service.start()
+    await summarization_cycle()
+
+async def on_demoted():
+    tasks = list(leader_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await summary_service.stop()
+
+leader = LeaderLease(on_elected=on_elected, on_demoted=on_demoted)
+
+COMMANDS = {"refresh": fetch_intel_cycle, "summarize": summarization_cycle}
+
+async def run_as_leader(job):
+    """Scheduler entry point: followers skip the job."""
+    if leader.is_leader:
+        await job()
+
+def handle_command(msg: dict):
+    """Runs a job another worker was asked for, if this process is the leader."""
+    job = COMMANDS.get(msg.get("command"))
+    if job is not None and leader.is_leader:
+        asyncio.create_task(job())
+
+def dispatch(command: str, background_tasks: BackgroundTasks) -> str:
+    if leader.is_leader:
+        background_tasks.add_task(COMMANDS[command])
+    else:
+        event_bus.append("command", {"command": command})
+    return "started" if leader.is_leader else "forwarded to leader"
 
 @app.on_event("startup")
 async def startup_event():
     init_db()
-    # Schedule hourly scraping
-    scheduler.add_job(fetch_intel_cycle, 'interval', hours=1)
-    # Schedule periodic summarization
-    scheduler.add_job(summarization_cycle, 'interval', minutes=30)
+    if event_bus is not None:
+        await event_bus.start(publisher.deliver, handle_command, replay_size=SSE_REPLAY_SIZE)
+    await leader.start()
+    # Every worker schedules; only the lease holder actually runs the jobs.
+    # Per-source polling on adaptive intervals
+    scheduler.add_job(run_as_leader, 'interval', seconds=SOURCE_TICK, args=[poll_due_sources])
+    # Sweep for anything the summarization workers missed
+    scheduler.add_job(run_as_leader, 'interval', minutes=30, args=[summarization_cycle])
+    # Archive expired articles
+    scheduler.add_job(run_as_leader, 'interval', hours=1, args=[retention_cycle])
     scheduler.start()
-    logger.info("Internal scheduler started: Scraper (1h), Summarizer (30m)")
+    logger.info(f"Internal scheduler started: Sources (adaptive, checked every {SOURCE_TICK}s), Summarizer sweep (30m), Retention (1h). Leader: {leader.is_leader}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    scheduler.shutdown(wait=False)
+    await leader.stop()
+    if event_bus is not None:
+        await event_bus.stop()
+    await summary_service.stop()
+    await scrapers.close_client()
+    await async_engine.dispose()
 
 # API Endpoints
 @app.get("/api/health")
@@ -187,60 +227,33 @@ def health_check():
     return {
         "status": "ok",
         "gemini_active": gemini_key is not None and len(gemini_key) > 5,
-        "local_db": os.path.exists("cyber_news.db")
+        "local_db": os.path.exists("cyber_news.db"),
+        "worker": leader.holder,
+        "leader": leader.is_leader
     }
 
-@app.get("/api/news")
-def get_news(db: Session = Depends(get_db)):
-    """Returns today's news, interleaved by source for variety."""
-    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    articles = db.query(Article).filter(Article.created_at >= today).order_by(Article.created_at.desc()).all()
-
-    if not articles: return []
-
-    # Round-Robin Interleaving
-    by_source = {}
-    for art in articles:
-        if art.source not in by_source: by_source[art.source] = []
-        by_source[art.source].append(art)
-
-    source_names = sorted(by_source.keys())
-    interleaved = []
-    max_count = max(len(v) for v in by_source.values())
-
-    for i in range(max_count):
-        for s in source_names:
-            if i < len(by_source[s]):
-                interleaved.append(by_source[s][i])
-
-    return interleaved
-
-@app.get("/api/history")
-def get_history(db: Session = Depends(get_db)):
-    return db.query(Article).order_by(Article.created_at.desc()).limit(100).all()
-
 @app.post("/api/refresh")
 async def trigger_refresh(background_tasks: BackgroundTasks):
-    background_tasks.add_task(fetch_intel_cycle)
-    return {"status": "refresh started"}
+    return {"status": f"refresh {dispatch('refresh', background_tasks)}"}
 
 @app.post("/api/summarize-batch")
 async def trigger_summarize(background_tasks: BackgroundTasks):
-    background_tasks.add_task(summarization_cycle)
-    return {"status": "summarization started"}
+    return {"status": f"summarization {dispatch('summarize', background_tasks)}"}
 
 @app.get("/api/stream")
 async def message_stream(request: Request):
+    """Live article/status events. Reconnecting clients send Last-Event-ID to replay what they missed."""
     async def event_generator():
-        queue = await publisher.subscribe()
+        sub = publisher.subscribe(request.headers.get("last-event-id"))
         try:
+            yield f"retry: {SSE_RETRY_MS}\n\n".encode()
             while True:
-                if await request.is_disconnected(): break
-                data = await queue.get()
-                yield {"data": data}
+                frame = await sub.get()
+                if frame is None: break
+                yield frame
         finally:
-            publisher.unsubscribe(queue)
-    return EventSourceResponse(event_generator())
+            publisher.unsubscribe(sub)
+    return EventSourceResponse(event_generator(), ping=SSE_HEARTBEAT)
 
 # Static Frontend Serving (MUST BE LAST)
 dist_path = os.path.join(os.getcwd(), "dist")
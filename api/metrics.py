@@ -0,0 +1,215 @@
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Kept free of app imports so every module can record into it
+logger = logging.getLogger(__name__)
+
+PREFIX = "cyberintel_"
+
+# Seconds; spans sub-millisecond DB work up to slow feeds and LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Metric:
+    """Base for in-process metrics rendered in the Prometheus text format.
+
+    Values are per process: with several workers each one reports its own,
+    as with prometheus_client's default (non-multiprocess) mode.
+    """
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str):
+        self.name = PREFIX + name
+        self.help = help
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(self._values.items())]
+
+class Gauge(Metric):
+    """Set directly, or computed at scrape time from a callback returning {labels-tuple: value}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Optional[Callable[[], Dict[LabelKey, float]]] = None):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_key(labels)] = value
+
+    def samples(self) -> List[str]:
+        values = dict(self._values)
+        if self.callback is not None:
+            try:
+                values.update(self.callback())
+            except Exception as e:
+                logger.warning(f"Gauge {self.name} callback failed: {e}")
+        return [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in sorted(values.items())]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> ([count per bucket..., +Inf], sum)
+        self._values: Dict[LabelKey, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+REGISTRY: List[Metric] = []
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+# Scraping
+FEED_FETCH_SECONDS = Histogram("feed_fetch_seconds", "Time to fetch one feed over HTTP")
+FEED_PARSE_SECONDS = Histogram("feed_parse_seconds", "Time to parse one feed in the parse pool")
+FEED_BYTES = Counter("feed_bytes_total", "Feed bytes downloaded")
+FEED_FETCHES = Counter("feed_fetches_total", "Feed polls by outcome (ok, not_modified, unchanged, error)")
+
+# Ingest and storage
+INGEST_ITEMS = Counter("ingest_items_total", "Scraped items by ingest result (new, duplicate, invalid)")
+INGEST_CLUSTERED = Counter("ingest_clustered_total", "New articles joining an existing story cluster")
+INGEST_FIRST_ARTICLE_SECONDS = Histogram("ingest_first_article_seconds", "Time from cycle start until the first new article is committed")
+DB_TRANSACTION_SECONDS = Histogram("db_transaction_seconds", "Duration of database transactions by outcome")
+
+# AI
+GEMINI_REQUEST_SECONDS = Histogram("gemini_request_seconds", "Gemini generate_content latency by outcome")
+GEMINI_RATE_LIMITED = Counter("gemini_rate_limited_total", "Gemini calls rejected with 429 / RESOURCE_EXHAUSTED")
+
+# Background jobs and API
+CYCLE_SECONDS = Histogram("cycle_seconds", "Duration of background cycles", buckets=DEFAULT_BUCKETS + (120.0, 300.0, 600.0))
+HTTP_REQUEST_SECONDS = Histogram("http_request_seconds", "Time to first response byte per endpoint")
+
+# Sampled at scrape time; main.py wires the callbacks
+SUMMARY_BACKLOG = Gauge("summarization_backlog", "Articles queued for summarization in this process")
+SSE_SUBSCRIBERS = Gauge("sse_subscribers", "Open /api/stream connections")
+SSE_QUEUE_DEPTH = Gauge("sse_queue_depth", "Frames waiting in SSE subscriber queues")
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing each request until its response starts.
+
+    Labels use the matched route template, not the raw path, to keep
+    cardinality bounded; streaming endpoints are timed to their first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        recorded = False
+
+        def record(status: int):
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope["method"], route=path, status=status)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                record(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            record(500)
+            raise
+
+def instrument_engine(sync_engine, name: str):
+    """Times every transaction on a SQLAlchemy engine (commit or rollback)."""
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "begin")
+    def _begin(conn):
+        conn.info["txn_started"] = time.perf_counter()
+
+    def _end(outcome):
+        def handler(conn):
+            started = conn.info.pop("txn_started", None)
+            if started is not None:
+                DB_TRANSACTION_SECONDS.observe(time.perf_counter() - started, engine=name, outcome=outcome)
+        return handler
+
+    event.listen(sync_engine, "commit", _end("commit"))
+    event.listen(sync_engine, "rollback", _end("rollback"))
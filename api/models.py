@@ -1,14 +1,65 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from sqlalchemy import create_engine, event, text, Column, Integer, String, Text, Date, DateTime, Float, Index, LargeBinary
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime, timezone
+from typing import AsyncIterator
+import logging
+import time
 import os
 
+from metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
 # Local-first SQLite database
-DATABASE_URL = "sqlite:///./cyber_news.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./cyber_news.db")
+ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+# Pool sizing (WAL allows many concurrent readers alongside the single writer)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Applied to every new connection
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",       # Readers never block behind the scraper's writes
+    "synchronous": "NORMAL",     # Safe with WAL, far fewer fsyncs
+    "busy_timeout": "5000",      # Wait for the write lock instead of failing
+    "temp_store": "MEMORY",
+    "cache_size": "-20000",      # ~20MB page cache per connection
+    "mmap_size": "268435456",    # 256MB memory-mapped reads
+    "foreign_keys": "ON",
+    "auto_vacuum": "INCREMENTAL", # Takes effect on new files; migrate_db() converts old ones
+}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
+event.listen(engine, "connect", _set_sqlite_pragmas)
+instrument_engine(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
+event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+instrument_engine(async_engine.sync_engine, "async")
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 Base = declarative_base()
 
 class Article(Base):
@@ -24,9 +75,203 @@ class Article(Base):
     severity = Column(String, default="Medium")
     published_at = Column(DateTime)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    cluster_id = Column(Integer, index=True)  # Story cluster (id of its first article)
+    entities_version = Column(Integer)        # Extractor version that indexed this row (NULL: not yet)
+
+    __table_args__ = (
+        # Today's feed, history and retention cutoff
+        Index("ix_articles_created_at", "created_at"),
+        # Per-source listings
+        Index("ix_articles_source_created_at", "source", "created_at"),
+        # Summarization backlog: summary IS NULL ORDER BY created_at
+        Index("ix_articles_unsummarized", "created_at", sqlite_where=text("summary IS NULL")),
+    )
+
+class FeedCache(Base):
+    """HTTP validators and body hash of the last fetch, per source."""
+    __tablename__ = "feed_cache"
+
+    source = Column(String, primary_key=True)
+    url = Column(String)
+    etag = Column(String)
+    last_modified = Column(String)
+    body_hash = Column(String)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class SummaryCache(Base):
+    """AI results keyed by normalized content + prompt/model version."""
+    __tablename__ = "summary_cache"
+
+    key = Column(String, primary_key=True)
+    category = Column(String)
+    severity = Column(String)
+    summary = Column(Text)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    last_used_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+class ArticleSignature(Base):
+    """MinHash signature backing the near-duplicate story index."""
+    __tablename__ = "article_signatures"
+
+    article_id = Column(Integer, primary_key=True)
+    cluster_id = Column(Integer, index=True)
+    signature = Column(LargeBinary)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+class ArticleEntity(Base):
+    """Inverted index of CVEs, IOCs and vendors/products: entity -> articles mentioning it."""
+    __tablename__ = "article_entities"
+
+    entity = Column(String, primary_key=True)       # Normalized value, e.g. CVE-2024-3400, 203.0.113.7, Fortinet
+    article_id = Column(Integer, primary_key=True)
+    kind = Column(String)                           # cve, vendor, product, ip, domain, md5, sha1, sha256
+    created_at = Column(DateTime)                   # The article's, for newest-first lookups and windows
+
+    __table_args__ = (
+        # /api/entities/{id}: newest mentions of one entity
+        Index("ix_article_entities_entity_created_at", "entity", "created_at", "article_id"),
+        # /api/entities/top: per-kind counts over a window, without touching the table
+        Index("ix_article_entities_kind_created_at", "kind", "created_at", "entity"),
+        # Retention deletes by article
+        Index("ix_article_entities_article_id", "article_id"),
+    )
+
+class SourceState(Base):
+    """Polling schedule and health of one feed in the source registry."""
+    __tablename__ = "source_state"
+
+    name = Column(String, primary_key=True)
+    url = Column(String)
+    interval = Column(Float)            # Seconds until the next poll
+    next_run_at = Column(DateTime)
+    last_run_at = Column(DateTime)
+    last_success_at = Column(DateTime)
+    last_status = Column(String)        # ok, not_modified, unchanged, degraded or error
+    last_error = Column(Text)
+    error_streak = Column(Integer, default=0)
+    latency_ms = Column(Float)
+    items_per_hour = Column(Float)      # Smoothed rate of new articles
+    last_new_items = Column(Integer, default=0)
+    fetches = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+
+class TermCount(Base):
+    """Per-day frequency of title keywords (pre-aggregated for /api/stats)."""
+    __tablename__ = "term_counts"
+
+    day = Column(Date, primary_key=True)
+    term = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+
+class ArticleCount(Base):
+    """Per-day article counts by category x severity x source."""
+    __tablename__ = "article_counts"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+
+class Lease(Base):
+    """Time-limited ownership of a singleton role (e.g. the scheduler) across processes."""
+    __tablename__ = "leases"
+
+    name = Column(String, primary_key=True)
+    holder = Column(String)
+    expires_at = Column(Float)  # Unix time
+
+class StreamEvent(Base):
+    """Shared log of SSE events and leader commands, tailed by every worker."""
+    __tablename__ = "stream_events"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String)  # "event" (replayable), "status" or "command"
+    payload = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+# Full-text index over articles (external content, kept in sync by triggers)
+ARTICLES_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+    "title, content, summary, content='articles', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN "
+    "INSERT INTO articles_fts(rowid, title, content, summary) VALUES (new.id, new.title, new.content, new.summary); END",
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN "
+    "INSERT INTO articles_fts(articles_fts, rowid, title, content, summary) "
+    "VALUES ('delete', old.id, old.title, old.content, old.summary); END",
+    # Only text changes touch the index (cluster/category updates don't)
+    "CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE OF title, content, summary ON articles BEGIN "
+    "INSERT INTO articles_fts(articles_fts, rowid, title, content, summary) "
+    "VALUES ('delete', old.id, old.title, old.content, old.summary); "
+    "INSERT INTO articles_fts(rowid, title, content, summary) VALUES (new.id, new.title, new.content, new.summary); END",
+]
+
+# Bump when migrate_db() learns a new step
+SCHEMA_VERSION = 6
+
+def migrate_db():
+    """Upgrades an existing cyber_news.db in place.
+
+    create_all() only creates missing tables, so new columns and indexes on
+    existing tables are added here. Progress is tracked in PRAGMA user_version.
+    """
+    with engine.begin() as conn:
+        version = conn.execute(text("PRAGMA user_version")).scalar() or 0
+        if version >= SCHEMA_VERSION:
+            return
+        if version < 2:
+            # Failed AI results used to be stored as summaries; clear them so they are retried
+            conn.execute(text(
+                "UPDATE articles SET summary = NULL, category = 'General', severity = 'Medium' "
+                "WHERE summary LIKE 'Summarization failed.%' "
+                "OR summary LIKE 'AI Summarization unavailable.%' "
+                "OR summary = 'Summary unavailable from AI.'"
+            ))
+        if version < 3:
+            columns = {row[1] for row in conn.execute(text("PRAGMA table_info(articles)"))}
+            if "cluster_id" not in columns:
+                conn.execute(text("ALTER TABLE articles ADD COLUMN cluster_id INTEGER"))
+        if version < 4:
+            for ddl in ARTICLES_FTS_DDL:
+                conn.execute(text(ddl))
+            # Index the rows that predate the triggers
+            conn.execute(text("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"))
+        if version < 6:
+            # Existing rows stay NULL and are picked up by entities.backfill()
+            columns = {row[1] for row in conn.execute(text("PRAGMA table_info(articles)"))}
+            if "entities_version" not in columns:
+                conn.execute(text("ALTER TABLE articles ADD COLUMN entities_version INTEGER"))
+        for index in Article.__table__.indexes:
+            index.create(bind=conn, checkfirst=True)
+        conn.execute(text("ANALYZE"))
+        conn.execute(text(f"PRAGMA user_version={SCHEMA_VERSION}"))
+    if version < 5:
+        enable_incremental_vacuum()
+    logger.info(f"Database migrated to schema version {SCHEMA_VERSION}.")
+
+def enable_incremental_vacuum():
+    """Switches an existing file to auto_vacuum=INCREMENTAL (needs one full VACUUM)."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if conn.execute(text("PRAGMA auto_vacuum")).scalar() == 2:
+            return
+        logger.info("Rebuilding database for incremental vacuum (one-time)...")
+        conn.execute(text("PRAGMA auto_vacuum=INCREMENTAL"))
+        conn.execute(text("VACUUM"))
 
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    # Workers started together race on the schema; the losers retry against the winner's result
+    for attempt in range(3):
+        try:
+            Base.metadata.create_all(bind=engine)
+            migrate_db()
+            return
+        except OperationalError as e:
+            if attempt == 2:
+                raise
+            logger.warning(f"Schema setup collided with another worker, retrying: {e}")
+            time.sleep(0.5)
 
 def get_db():
     db = SessionLocal()
@@ -34,3 +279,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,195 @@
+import gzip
+import time
+import hashlib
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Article
+from schemas import LIST_FIELDS, dumps
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Don't bother compressing tiny payloads
+MIN_COMPRESS_SIZE = 512
+
+ARTICLE_COLUMNS = [c.name for c in Article.__table__.columns]
+
+def _today() -> datetime:
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _row(article: Article) -> Dict[str, Any]:
+    row = {}
+    for name in ARTICLE_COLUMNS:
+        value = getattr(article, name)
+        row[name] = value.isoformat() if isinstance(value, datetime) else value
+    row["cluster_id"] = row["cluster_id"] or row["id"]
+    return row
+
+def interleave_by_source(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Round-robin across sources (alphabetical), keeping each source's newest-first order."""
+    by_source: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_source.setdefault(row["source"], []).append(row)
+
+    interleaved = []
+    source_names = sorted(by_source, key=lambda s: (s is None, s or ""))
+    max_count = max((len(v) for v in by_source.values()), default=0)
+    for i in range(max_count):
+        for s in source_names:
+            if i < len(by_source[s]):
+                interleaved.append(by_source[s][i])
+    return interleaved
+
+def collapse_clusters(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One representative per story cluster, with the other reports attached as `related`.
+
+    The representative is the first summarized report (else the earliest one);
+    clusters keep the position of their newest report.
+    """
+    clusters: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        clusters.setdefault(row["cluster_id"] or row["id"], []).append(row)
+
+    collapsed = []
+    for members in clusters.values():
+        rep = min(members, key=lambda r: (r["summary"] is None, r["created_at"] or "", r["id"]))
+        collapsed.append(dict(rep, related=[
+            {"id": r["id"], "title": r["title"], "url": r["url"], "source": r["source"]}
+            for r in members if r is not rep
+        ]))
+    return collapsed
+
+# Strong validators must differ per content-coding, so compressed variants get a suffix
+_ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+class Rendered:
+    """A serialized feed plus its strong ETags and lazily built compressed variants."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self._encoded: Dict[str, bytes] = {}
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Best encoding for the client's Accept-Encoding: br, then gzip, then identity (None)."""
+        if len(self.body) < MIN_COMPRESS_SIZE:
+            return None
+        accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and (encoding != "br" or brotli is not None):
+                return encoding
+        return None
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        return '"' + self.digest + _ETAG_SUFFIXES.get(encoding, "") + '"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """If-None-Match uses weak comparison: any coding of this body counts as a match."""
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            tag = tag[2:] if tag.startswith("W/") else tag
+            tag = tag.strip('"')
+            for suffix in _ETAG_SUFFIXES.values():
+                if tag.endswith(suffix):
+                    tag = tag[:-len(suffix)]
+                    break
+            if tag == self.digest:
+                return True
+        return False
+
+    def encode(self, encoding: Optional[str]) -> bytes:
+        """The body in the given encoding, compressed once and then reused."""
+        if encoding is None:
+            return self.body
+        if encoding not in self._encoded:
+            if encoding == "br":
+                self._encoded[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self._encoded[encoding]
+
+class NewsFeedSnapshot:
+    """Materialized, pre-serialized view of today's /api/news feed.
+
+    Rows are loaded once per day and refreshed by id when ingest or
+    summarization touches them; requests in between reuse the rendered bytes.
+    With `max_age` set (serverless instances, which see no change events),
+    the snapshot is also reloaded once it is that many seconds old.
+    """
+
+    def __init__(self, max_age: Optional[float] = None):
+        self.max_age = max_age
+        self.loaded_at = 0.0
+        self.day: Optional[datetime] = None
+        self.rows: Dict[int, Dict[str, Any]] = {}
+        self._dirty: Set[int] = set()
+        self._rendered: Dict[Tuple[bool, Tuple[str, ...]], Rendered] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+    def touch(self, article_ids: Iterable[int]):
+        """Marks rows as changed; they are re-read on the next request."""
+        self._dirty.update(article_ids)
+
+    def invalidate(self):
+        """Forces a full reload on the next request."""
+        self.day = None
+
+    async def get(self, db: AsyncSession, collapse: bool = False, fields: Optional[List[str]] = None) -> Rendered:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            today = _today()
+            expired = self.max_age is not None and time.monotonic() - self.loaded_at > self.max_age
+            if self.day != today or expired:
+                await self._reload(db, today)
+            elif self._dirty:
+                await self._refresh(db, today)
+            key = (collapse, tuple(fields or LIST_FIELDS))
+            if key not in self._rendered:
+                self._rendered[key] = self._render(collapse, list(key[1]))
+            return self._rendered[key]
+
+    async def _reload(self, db: AsyncSession, today: datetime):
+        articles = (await db.scalars(select(Article).where(Article.created_at >= today))).all()
+        self.rows = {a.id: _row(a) for a in articles}
+        self.day = today
+        self.loaded_at = time.monotonic()
+        self._dirty.clear()
+        self._rendered.clear()
+
+    async def _refresh(self, db: AsyncSession, today: datetime):
+        ids, self._dirty = list(self._dirty), set()
+        articles = (await db.scalars(select(Article).where(Article.id.in_(ids)))).all()
+        found = set()
+        for a in articles:
+            found.add(a.id)
+            if a.created_at is not None and a.created_at >= today.replace(tzinfo=None):
+                self.rows[a.id] = _row(a)
+            else:
+                self.rows.pop(a.id, None)
+        for missing in set(ids) - found:
+            self.rows.pop(missing, None)
+        self._rendered.clear()
+
+    def _render(self, collapse: bool, fields: List[str]) -> Rendered:
+        rows = sorted(self.rows.values(), key=lambda r: (r["created_at"] or "", r["id"]), reverse=True)
+        if collapse:
+            rows = collapse_clusters(rows)
+            fields = fields + ["related"]
+        # Project after interleaving so only the requested columns are serialized
+        projected = [{f: row[f] for f in fields} for row in interleave_by_source(rows)]
+        return Rendered(dumps(projected))
+
+news_feed = NewsFeedSnapshot()
@@ -0,0 +1,146 @@
+import asyncio
+import html
+import os
+import re
+import time
+import logging
+import feedparser
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+from dedupe import minhash, story_text
+
+# Kept free of app imports so worker processes start cheaply
+logger = logging.getLogger(__name__)
+
+# Parse pool tuning
+PARSE_EXECUTOR = os.getenv("PARSE_EXECUTOR", "process")  # "process" or "thread"
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_BATCH_SIZE = int(os.getenv("PARSE_BATCH_SIZE", "4"))
+PARSE_BATCH_WAIT = float(os.getenv("PARSE_BATCH_WAIT", "0.05"))  # Seconds to wait for a batch to fill
+
+CONTENT_CAP = 2000  # Capped for AI context window
+
+# Cheap HTML-to-text for the simple markup found in feed summaries
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+def clean_html(content: str) -> str:
+    """Strips tags and entities from summary HTML, collapsing whitespace."""
+    if not content:
+        return ''
+    if '<' in content:
+        content = _SCRIPT_STYLE_RE.sub(' ', content)
+        content = _TAG_RE.sub(' ', content)
+    return _WS_RE.sub(' ', html.unescape(content)).strip()
+
+def parse_rss_date(struct_time: Any) -> datetime:
+    """Helper to parse RSS published_parsed into a timezone-aware datetime."""
+    if not struct_time:
+        return datetime.now(timezone.utc)
+    return datetime.fromtimestamp(time.mktime(struct_time), tz=timezone.utc)
+
+def parse_feed(body: bytes, source_name: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Parses a raw RSS/Atom document into article dicts."""
+    feed = feedparser.parse(body)
+    articles = []
+
+    for entry in feed.entries[:limit]:
+        # Extract and clean content
+        content = entry.get('summary', '')
+        if not content and 'content' in entry:
+            content = entry.content[0].value
+
+        title = entry.get('title', 'No Title')
+        clean_content = clean_html(content)[:CONTENT_CAP]
+        articles.append({
+            'title': title,
+            'url': entry.get('link', ''),
+            'content': clean_content,
+            'source': source_name,
+            'published_at': parse_rss_date(entry.get('published_parsed')),
+            # Near-duplicate signature, computed here to keep it off the event loop
+            'signature': minhash(story_text(title, clean_content))
+        })
+    return articles
+
+def parse_feed_batch(batch: List[Tuple[bytes, str, int]]) -> List[Union[List[Dict[str, Any]], Exception]]:
+    """Worker entry point: parses several feeds in one pool round trip.
+
+    A feed that fails to parse yields its exception in place of the article
+    list, so only that caller sees the error and its siblings still succeed.
+    """
+    results = []
+    for body, source_name, limit in batch:
+        try:
+            results.append(parse_feed(body, source_name, limit))
+        except Exception as e:
+            results.append(e)
+    return results
+
+_executor: Optional[Executor] = None
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if PARSE_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="feed-parse")
+        else:
+            _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _executor
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+
+class ParseBatcher:
+    """Groups parse requests from concurrent scrapers into executor batches."""
+
+    def __init__(self, batch_size: int = PARSE_BATCH_SIZE, max_wait: float = PARSE_BATCH_WAIT):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: List[Tuple[bytes, str, int, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def parse(self, body: bytes, source_name: str, limit: int = 10) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((body, source_name, limit, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(get_executor(), parse_feed_batch, [item[:3] for item in batch])
+        futures = [item[3] for item in batch]
+
+        def _deliver(done: asyncio.Future):
+            if done.cancelled() or done.exception():
+                exc = None if done.cancelled() else done.exception()
+                for f in futures:
+                    if not f.done():
+                        f.set_exception(exc or asyncio.CancelledError())
+                return
+            for f, articles in zip(futures, done.result()):
+                if f.done():
+                    continue
+                if isinstance(articles, Exception):
+                    f.set_exception(articles)
+                else:
+                    f.set_result(articles)
+
+        work.add_done_callback(_deliver)
@@ -0,0 +1,176 @@
+import os
+import time
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from models import AsyncSessionLocal
+from ingest import ingest_articles, normalize_url
+import scrapers
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Stage tuning
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))        # Feeds or batches buffered between stages
+PERSIST_BATCH = int(os.getenv("PIPELINE_PERSIST_BATCH", "50"))           # Articles per insert + commit
+PERSIST_WAIT = float(os.getenv("PIPELINE_PERSIST_WAIT", "0.25"))         # Max seconds a parsed article waits for its batch
+PARSE_CONCURRENCY = int(os.getenv("PIPELINE_PARSE_CONCURRENCY", "4"))    # Feeds handed to the parse pool at once
+
+_DONE = object()  # End-of-stream marker passed down the stages
+
+@dataclass
+class PipelineResult:
+    outcomes: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # Fetch outcome per source
+    new_by_source: Counter = field(default_factory=Counter)
+    first_article_after: Optional[float] = None                        # Seconds until the first row was published
+
+    @property
+    def new_count(self) -> int:
+        return sum(self.new_by_source.values())
+
+async def run_pipeline(sources: List[Dict[str, Any]],
+                       on_new: Callable[[Dict[str, Any]], Awaitable[None]]) -> PipelineResult:
+    """Streams sources through fetch -> parse -> normalize/dedupe -> persist -> publish.
+
+    Every stage is a task connected to the next by a bounded queue, so a
+    slow stage pushes back on the ones before it and memory stays bounded
+    by the queue sizes, not by the number of sources. Articles from the
+    fastest feeds are committed and handed to `on_new` while slower feeds
+    are still downloading. Failures stay with their source: a fetch or
+    parse error only marks that source, an item with a malformed link is
+    dropped and its source marked degraded, and a failed insert batch is
+    retried per source with the failing one's feed cache dropped so it is
+    refetched next time.
+    """
+    started = time.perf_counter()
+    result = PipelineResult()
+    await scrapers.load_feed_cache()
+
+    todo: asyncio.Queue = asyncio.Queue()
+    for source in sources:
+        todo.put_nowait(source)
+    bodies: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    parsed: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    batches: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    persisted: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+
+    async def fetch_worker():
+        while not todo.empty():
+            source = todo.get_nowait()
+            outcome = await scrapers.fetch_feed(source["url"], source["name"])
+            body = outcome.pop("body")
+            result.outcomes[source["name"]] = outcome
+            if body is not None:
+                await bodies.put((source, body))
+
+    async def fetch():
+        # The scrapers' global/per-host limits still apply; this only caps the workers
+        await asyncio.gather(*(fetch_worker() for _ in range(min(scrapers.MAX_CONCURRENCY, len(sources)) or 1)))
+        await bodies.put(_DONE)
+
+    async def parse_worker():
+        while True:
+            item = await bodies.get()
+            if item is _DONE:
+                await bodies.put(_DONE)  # Let the sibling workers see it too
+                return
+            source, body = item
+            try:
+                articles = await scrapers.parse_feed_body(body, source["name"], source.get("limit", 10))
+            except Exception as e:
+                logger.error(f"Error parsing feed {source['name']}: {e}")
+                result.outcomes[source["name"]].update(status="error", error=f"Parse failed: {e}")
+                scrapers.forget_feed(source["name"])
+                continue
+            await parsed.put(articles)
+
+    async def parse():
+        await asyncio.gather(*(parse_worker() for _ in range(PARSE_CONCURRENCY)))
+        await parsed.put(_DONE)
+
+    async def normalize():
+        """Drops URL-less or malformed items and cross-feed repeats, and groups the rest into insert batches."""
+        seen: Set[str] = set()
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                articles = await asyncio.wait_for(parsed.get(), timeout)
+            except asyncio.TimeoutError:
+                articles = []
+            if articles is _DONE:
+                if batch:
+                    await batches.put(batch)
+                await batches.put(_DONE)
+                return
+            for article in articles:
+                try:
+                    url = normalize_url(article.get("url", ""))
+                except ValueError as e:
+                    # One malformed link drops that item and flags its source, nothing more
+                    logger.warning(f"Dropping {article['source']} item with invalid URL {article.get('url')!r}: {e}")
+                    metrics.INGEST_ITEMS.inc(result="invalid")
+                    result.outcomes[article["source"]].update(status="degraded", error=f"Dropped item with invalid URL: {e}")
+                    continue
+                if not url or url in seen:
+                    continue
+                seen.add(url)
+                batch.append(article)
+                if deadline is None:
+                    deadline = time.monotonic() + PERSIST_WAIT
+            if batch and (len(batch) >= PERSIST_BATCH or time.monotonic() >= deadline):
+                await batches.put(batch)
+                batch, deadline = [], None
+
+    async def insert(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async with AsyncSessionLocal() as db:
+            rows = await db.run_sync(ingest_articles, articles)
+            await db.commit()
+            return rows
+
+    async def persist():
+        while True:
+            batch = await batches.get()
+            if batch is _DONE:
+                await persisted.put(_DONE)
+                return
+            try:
+                rows = await insert(batch)
+            except Exception as e:
+                logger.error(f"Ingest batch of {len(batch)} failed, retrying per source: {e}")
+                rows = []
+                by_source: Dict[str, List[Dict[str, Any]]] = {}
+                for article in batch:
+                    by_source.setdefault(article["source"], []).append(article)
+                for name, articles in by_source.items():
+                    try:
+                        rows.extend(await insert(articles))
+                    except Exception as e:
+                        logger.error(f"Ingest failed for {name}: {e}")
+                        scrapers.forget_feed(name)
+            if rows:
+                await persisted.put(rows)
+
+    async def publish():
+        while True:
+            rows = await persisted.get()
+            if rows is _DONE:
+                return
+            if result.first_article_after is None:
+                result.first_article_after = time.perf_counter() - started
+                metrics.INGEST_FIRST_ARTICLE_SECONDS.observe(result.first_article_after)
+            for row in rows:
+                result.new_by_source[row["source"]] += 1
+                await on_new(row)
+
+    tasks = [asyncio.create_task(stage()) for stage in (fetch, parse, normalize, persist, publish)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return result
@@ -0,0 +1,59 @@
+import os
+import time
+import logging
+import functools
+from contextlib import asynccontextmanager
+
+import metrics
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # Optional: profiling hooks are no-ops without it
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+# Opt-in sampling profiler around background cycles, e.g. PROFILE_CYCLES=fetch_intel_cycle,summarization_cycle
+PROFILE_CYCLES = {name.strip() for name in os.getenv("PROFILE_CYCLES", "").split(",") if name.strip()}
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))  # Seconds between samples
+
+_warned = False
+
+def enabled(name: str) -> bool:
+    return name in PROFILE_CYCLES or "all" in PROFILE_CYCLES
+
+@asynccontextmanager
+async def profiled(name: str):
+    """Samples the wrapped block with pyinstrument and writes an HTML report to PROFILE_DIR."""
+    global _warned
+    if not enabled(name):
+        yield
+        return
+    if Profiler is None:
+        if not _warned:
+            logger.warning("PROFILE_CYCLES is set but pyinstrument is not installed; profiling disabled.")
+            _warned = True
+        yield
+        return
+
+    profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.html")
+        with open(path, "w") as f:
+            f.write(profiler.output_html())
+        logger.info(f"Profile of {name} written to {path}")
+
+def instrumented(fn):
+    """Decorator for background cycles: records cycle_seconds and applies the profiler hook."""
+    @functools.wraps(fn)
+    async def run(*args, **kwargs):
+        async with profiled(fn.__name__):
+            with metrics.CYCLE_SECONDS.time(cycle=fn.__name__):
+                return await fn(*args, **kwargs)
+    return run
@@ -0,0 +1,160 @@
+import os
+import io
+import gzip
+import json
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, text
+from sqlalchemy.orm import Session
+
+from models import Article, ArticleSignature, ArticleEntity
+
+try:
+    import zstandard
+except ImportError:  # Optional: gzip is always available
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Hot-table retention and archive settings
+RETENTION_DAYS = int(os.getenv("AUTO_DELETE_DAYS", "7"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+ARCHIVE_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "gzip")  # "gzip" or "zstd"
+RETENTION_BATCH = int(os.getenv("RETENTION_BATCH", "500"))      # Rows moved per transaction
+VACUUM_PAGES = int(os.getenv("RETENTION_VACUUM_PAGES", "0"))    # Pages freed per run (0 = all)
+
+EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+ARTICLE_COLUMNS = [c.name for c in Article.__table__.columns]
+
+def _codec() -> str:
+    if ARCHIVE_COMPRESSION == "zstd" and zstandard is None:
+        logger.warning("ARCHIVE_COMPRESSION=zstd but zstandard is not installed; using gzip.")
+        return "gzip"
+    return ARCHIVE_COMPRESSION if ARCHIVE_COMPRESSION in EXTENSIONS else "gzip"
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    # Every append is its own gzip member / zstd frame; both formats allow concatenation
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True).read()
+    return gzip.decompress(data)
+
+def _partition_path(day: date, codec: str) -> str:
+    return os.path.join(ARCHIVE_DIR, day.isoformat() + EXTENSIONS[codec])
+
+def _row(article: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in article.items()}
+
+def _append(day: date, rows: List[Dict[str, Any]], codec: str):
+    """Appends one compressed chunk to the day's partition and makes it durable."""
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    payload = "".join(json.dumps(_row(r), separators=(",", ":"), ensure_ascii=False) + "\n" for r in rows)
+    with open(_partition_path(day, codec), "ab") as f:
+        f.write(_compress(codec, payload.encode()))
+        f.flush()
+        os.fsync(f.fileno())
+
+def archive_expired(db: Session, cutoff: Optional[datetime] = None) -> int:
+    """Moves articles older than the cutoff into day-partitioned archive files.
+
+    Works in batches of RETENTION_BATCH: rows are appended to their partitions
+    first and deleted afterwards, each batch in its own short transaction, so
+    ingest never waits long on the write lock. A crash between the two steps
+    only leaves duplicates in the archive, which readers drop by id.
+    """
+    cutoff = cutoff or datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+    codec = _codec()
+    moved = 0
+    while True:
+        rows = db.execute(
+            select(*[Article.__table__.c[name] for name in ARTICLE_COLUMNS])
+            .where(Article.created_at < cutoff)
+            .order_by(Article.id)
+            .limit(RETENTION_BATCH)
+        ).mappings().all()
+        if not rows:
+            break
+
+        by_day: Dict[date, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_day.setdefault(row["created_at"].date(), []).append(dict(row))
+        for day, day_rows in by_day.items():
+            _append(day, day_rows, codec)
+
+        ids = [row["id"] for row in rows]
+        db.execute(delete(ArticleSignature).where(ArticleSignature.article_id.in_(ids)))
+        db.execute(delete(ArticleEntity).where(ArticleEntity.article_id.in_(ids)))
+        db.execute(delete(Article).where(Article.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+
+    # Signatures and entity links of articles that were already gone
+    db.execute(delete(ArticleSignature).where(ArticleSignature.created_at < cutoff))
+    db.execute(delete(ArticleEntity).where(ArticleEntity.created_at < cutoff))
+    db.commit()
+    if moved:
+        logger.info(f"Retention: archived {moved} articles older than {cutoff.date()}.")
+    return moved
+
+def reclaim_space(db: Session):
+    """Returns freed pages to the filesystem (requires auto_vacuum=INCREMENTAL)."""
+    free_pages = db.execute(text("PRAGMA freelist_count")).scalar() or 0
+    if not free_pages:
+        return
+    # The pragma frees one page per step; executescript runs it to completion
+    pragma = f"PRAGMA incremental_vacuum({VACUUM_PAGES});" if VACUUM_PAGES else "PRAGMA incremental_vacuum;"
+    db.connection().connection.driver_connection.executescript(pragma)
+    db.commit()
+    # In WAL mode the file only shrinks once the truncation is checkpointed
+    db.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))
+    logger.info(f"Retention: reclaimed up to {VACUUM_PAGES or free_pages} of {free_pages} free pages.")
+
+def run_retention(db: Session, cutoff: Optional[datetime] = None) -> int:
+    """One retention pass: archive and delete expired rows, then shrink the file."""
+    moved = archive_expired(db, cutoff)
+    reclaim_space(db)
+    return moved
+
+# Read-only access to archived days
+def list_archive() -> List[Dict[str, Any]]:
+    """Archived days with their on-disk size, newest first."""
+    if not os.path.isdir(ARCHIVE_DIR):
+        return []
+    days: Dict[str, int] = {}
+    for name in os.listdir(ARCHIVE_DIR):
+        for ext in EXTENSIONS.values():
+            if name.endswith(ext):
+                day = name[:-len(ext)]
+                days[day] = days.get(day, 0) + os.path.getsize(os.path.join(ARCHIVE_DIR, name))
+    return [{"day": day, "bytes": size} for day, size in sorted(days.items(), reverse=True)]
+
+def read_archive_day(day: str) -> List[Dict[str, Any]]:
+    """All articles archived for a day (YYYY-MM-DD), newest first."""
+    try:
+        parsed = date.fromisoformat(day)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="day must be YYYY-MM-DD")
+
+    articles: Dict[int, Dict[str, Any]] = {}
+    found = False
+    for codec in EXTENSIONS:
+        path = _partition_path(parsed, codec)
+        if not os.path.exists(path) or (codec == "zstd" and zstandard is None):
+            continue
+        found = True
+        with open(path, "rb") as f:
+            for line in _decompress(codec, f.read()).splitlines():
+                if line:
+                    row = json.loads(line)
+                    articles[row["id"]] = row
+    if not found:
+        raise HTTPException(status_code=404, detail="No archive for that day")
+    return sorted(articles.values(), key=lambda r: (r.get("created_at") or "", r["id"]), reverse=True)
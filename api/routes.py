@@ -0,0 +1,143 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Request, HTTPException, Response, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Article, get_async_db
+from news_feed import news_feed
+from schemas import ArticleItem, NewsItem, HistoryPage, SearchPage, EntityPage, TopEntities, parse_fields, encode_cursor, decode_cursor, dumps
+from search import search_articles
+from sources import source_health
+import analytics
+import entities
+import retention
+import metrics
+
+# Read-only API shared by the long-running server (main.py) and the serverless entry point (index.py).
+# Keep imports light: nothing here may pull in the scrapers, the scheduler or the Gemini client.
+router = APIRouter()
+
+@router.get("/api/metrics")
+def get_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/api/news", responses={200: {"model": List[NewsItem]}})
+async def get_news(request: Request, collapse: bool = False, fields: Optional[str] = None,
+                   db: AsyncSession = Depends(get_async_db)):
+    """Returns today's news, interleaved by source for variety.
+
+    Served from a materialized snapshot with gzip/brotli compression and a
+    strong ETag per encoding (304 when any of them matches). `content` is omitted unless requested through
+    ?fields= (?fields=*,content adds it to the list fields). With
+    ?collapse=true, near-duplicate reports are folded into one item per story.
+    """
+    snapshot = await news_feed.get(db, collapse, parse_fields(fields))
+    encoding = snapshot.negotiate(request.headers.get("accept-encoding", ""))
+    headers = {"ETag": snapshot.etag(encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if snapshot.matches(request.headers.get("if-none-match", "")):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=snapshot.encode(encoding), media_type="application/json", headers=headers)
+
+@router.get("/api/history", responses={200: {"model": HistoryPage}})
+async def get_history(limit: int = Query(100, ge=1, le=500), cursor: Optional[str] = None,
+                      fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Newest-first archive, keyset-paginated on (created_at, id).
+
+    Pass the returned `next_cursor` back as ?cursor= for the next page.
+    """
+    columns = parse_fields(fields)
+    selected = list(dict.fromkeys(columns + ["created_at", "id"]))
+    query = select(*[Article.__table__.c[name] for name in selected])
+    if cursor:
+        created_at, article_id = decode_cursor(cursor)
+        query = query.where(tuple_(Article.created_at, Article.id) < (created_at, article_id))
+    rows = (await db.execute(
+        query.order_by(Article.created_at.desc(), Article.id.desc()).limit(limit + 1)
+    )).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    items = [{name: row[name] for name in columns} for row in rows]
+    return Response(content=dumps({"items": items, "next_cursor": next_cursor}), media_type="application/json")
+
+@router.get("/api/search", responses={200: {"model": SearchPage}})
+async def search(q: str = Query(..., min_length=1, max_length=200), source: Optional[str] = None,
+                 category: Optional[str] = None, severity: Optional[str] = None,
+                 since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0, le=10000),
+                 db: AsyncSession = Depends(get_async_db)):
+    """Full-text search over titles, content and summaries (SQLite FTS5, BM25-ranked).
+
+    Terms are ANDed; use "quotes" for phrases and a trailing * for prefixes.
+    `since`/`until` filter on the publish date. Page with the returned `next_offset`.
+    """
+    page = await search_articles(db, q, source, category, severity, since, until, limit, offset)
+    return Response(content=dumps(page), media_type="application/json")
+
+@router.get("/api/stats")
+async def get_stats(window: str = "7d", db: AsyncSession = Depends(get_async_db)):
+    """Threat landscape aggregates (categories, severities, sources, keywords, daily trend).
+
+    `window` is a number of days ("1d" = today, up to 90d); every breakdown
+    carries its delta against the preceding window of the same length.
+    """
+    return Response(content=dumps(await analytics.get_stats(db, analytics.parse_window(window))),
+                    media_type="application/json")
+
+# /top is declared first so it isn't taken for an entity id
+@router.get("/api/entities/top", responses={200: {"model": TopEntities}})
+async def get_top_entities(window: str = "7d", kind: Optional[str] = None, limit: int = Query(20, ge=1, le=100),
+                           db: AsyncSession = Depends(get_async_db)):
+    """Most-mentioned CVEs, IOCs and vendors/products over the last `window` days, optionally one ?kind=."""
+    page = await entities.top_entities(db, analytics.parse_window(window), kind, limit)
+    return Response(content=dumps(page), media_type="application/json")
+
+@router.get("/api/entities/{entity_id}", responses={200: {"model": EntityPage}})
+async def get_entity(entity_id: str, limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None,
+                     db: AsyncSession = Depends(get_async_db)):
+    """Everything written about one entity: a CVE id, IP, domain, hash or vendor/product name.
+
+    Served from the entity index, newest first; page with the returned `next_cursor`.
+    """
+    page = await entities.entity_articles(db, entity_id, limit, cursor)
+    return Response(content=dumps(page), media_type="application/json")
+
+@router.get("/api/sources")
+async def get_sources(db: AsyncSession = Depends(get_async_db)):
+    """Per-source health: last status/success/error, error streak, latency and polling interval."""
+    return Response(content=dumps(await source_health(db)), media_type="application/json")
+
+@router.get("/api/archive")
+async def list_archive():
+    """Days that have been moved out of the live database."""
+    return await asyncio.to_thread(retention.list_archive)
+
+@router.get("/api/archive/{day}")
+async def get_archive_day(day: str, source: Optional[str] = None, fields: Optional[str] = None,
+                          limit: int = Query(100, ge=1, le=500), offset: int = Query(0, ge=0)):
+    """Read-only view of one archived day (YYYY-MM-DD), newest first."""
+    columns = parse_fields(fields)
+    rows = await asyncio.to_thread(retention.read_archive_day, day)
+    if source:
+        rows = [r for r in rows if r.get("source") == source]
+    page = rows[offset:offset + limit]
+    items = [{name: row.get(name) for name in columns} for row in page]
+    next_offset = offset + limit if len(rows) > offset + limit else None
+    return Response(content=dumps({"items": items, "next_offset": next_offset}), media_type="application/json")
+
+@router.get("/api/articles/{article_id}", response_model=ArticleItem)
+async def get_article(article_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Full article, including the scraped `content` omitted from list views."""
+    article = await db.get(Article, article_id)
+    if article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return article
@@ -0,0 +1,115 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the stdlib encoder
+    orjson = None
+
+# List views never show the raw scraped text; it is opt-in via ?fields=
+LIST_FIELDS = ["id", "title", "url", "summary", "source", "category", "severity", "published_at", "created_at", "cluster_id"]
+OPTIONAL_FIELDS = ["content"]
+ALL_FIELDS = LIST_FIELDS + OPTIONAL_FIELDS
+
+class ArticleItem(BaseModel):
+    """Lean list-view article. `content` is only present when requested."""
+    id: int
+    title: Optional[str] = None
+    url: Optional[str] = None
+    summary: Optional[str] = None
+    source: Optional[str] = None
+    category: Optional[str] = None
+    severity: Optional[str] = None
+    published_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    cluster_id: Optional[int] = None
+    content: Optional[str] = None
+
+class RelatedReport(BaseModel):
+    id: int
+    title: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[str] = None
+
+class NewsItem(ArticleItem):
+    related: Optional[List[RelatedReport]] = None
+
+class HistoryPage(BaseModel):
+    items: List[ArticleItem]
+    next_cursor: Optional[str] = None
+
+class SearchHit(ArticleItem):
+    snippet: Optional[str] = None  # Best-matching fragment, hits wrapped in <mark>
+    score: float                   # BM25 (lower is better)
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_offset: Optional[int] = None
+
+class EntityPage(BaseModel):
+    entity: str                            # Normalized id, e.g. CVE-2024-3400
+    kind: str                              # cve, vendor, product, ip, domain, md5, sha1 or sha256
+    count: int                             # Articles mentioning it
+    first_seen: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    items: List[ArticleItem]
+    next_cursor: Optional[str] = None
+
+class EntityCount(BaseModel):
+    entity: str
+    kind: str
+    count: int
+
+class TopEntities(BaseModel):
+    window_days: int
+    kind: Optional[str] = None
+    items: List[EntityCount]
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Resolves ?fields=: empty means LIST_FIELDS, "*,content" adds to them, else an explicit list.
+
+    "+content" (or "%2Bcontent") is also additive; an unescaped + arrives
+    decoded as a space, so a leading space counts the same.
+    """
+    if not fields:
+        return list(LIST_FIELDS)
+    entries = [f for f in fields.split(",") if f.strip()]
+    requested = [f.strip().lstrip("+") for f in entries if f.strip() != "*"]
+    prefixed = entries and all(f.startswith((" ", "+")) for f in entries)
+    if prefixed or len(requested) < len(entries):
+        requested = LIST_FIELDS + requested
+    unknown = [f for f in requested if f not in ALL_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in requested:
+        requested.insert(0, "id")
+    # Keep a canonical order so equivalent requests share cached renders
+    return [f for f in ALL_FIELDS if f in requested]
+
+def encode_cursor(created_at: datetime, article_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), article_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, article_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(article_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(value: Any) -> bytes:
+    """Fast JSON encoding (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, separators=(",", ":"), default=_default).encode()
@@ -1,10 +1,18 @@
 import httpx
-from bs4 import BeautifulSoup
 from datetime import datetime, timezone
+from urllib.parse import urlparse
+import asyncio
 import logging
-import feedparser
+import hashlib
+import os
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from sqlalchemy import select
+
+from models import AsyncSessionLocal, FeedCache
+from parsing import ParseBatcher, shutdown_executor
+import metrics
 
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
@@ -16,81 +24,180 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
-def parse_rss_date(struct_time: Any) -> datetime:
-    """Helper to parse RSS published_parsed into a timezone-aware datetime."""
-    if not struct_time:
-        return datetime.now(timezone.utc)
-    return datetime.fromtimestamp(time.mktime(struct_time), tz=timezone.utc)
+# Fetcher engine tuning
+MAX_CONCURRENCY = int(os.getenv("SCRAPER_CONCURRENCY", "8"))   # Feeds in flight at once
+PER_HOST_LIMIT = int(os.getenv("SCRAPER_PER_HOST_LIMIT", "2"))   # Requests in flight per host
+SOURCE_DEADLINE = float(os.getenv("SCRAPER_SOURCE_DEADLINE", "20"))  # Hard cap per source (seconds)
+
+# Shared connection pool, created lazily on first use
+_client: Optional[httpx.AsyncClient] = None
+_global_limit: Optional[asyncio.Semaphore] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+_parse_batcher: Optional[ParseBatcher] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _bind_loop():
+    """Resets the pool and limiters if we are now running on a different event loop."""
+    global _client, _global_limit, _parse_batcher, _loop
+    loop = asyncio.get_running_loop()
+    if _loop is not loop:
+        _client, _global_limit, _parse_batcher, _loop = None, None, None, loop
+        _host_limits.clear()
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the long-lived HTTP client shared by all scrapers."""
+    global _client
+    _bind_loop()
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            headers=HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENCY * PER_HOST_LIMIT,
+                max_keepalive_connections=MAX_CONCURRENCY * PER_HOST_LIMIT,
+                keepalive_expiry=120.0
+            )
+        )
+    return _client
+
+async def close_client():
+    """Closes the shared HTTP client and parse pool (call on application shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    shutdown_executor()
+
+def _get_parse_batcher() -> ParseBatcher:
+    global _parse_batcher
+    _bind_loop()
+    if _parse_batcher is None:
+        _parse_batcher = ParseBatcher()
+    return _parse_batcher
 
-async def scrape_rss_feed(url: str, source_name: str, limit: int = 10) -> List[Dict[str, Any]]:
-    """Generic RSS feed scraper."""
+def _get_global_limit() -> asyncio.Semaphore:
+    global _global_limit
+    _bind_loop()
+    if _global_limit is None:
+        _global_limit = asyncio.Semaphore(MAX_CONCURRENCY)
+    return _global_limit
+
+def _get_host_limit(url: str) -> asyncio.Semaphore:
+    host = urlparse(url).netloc.lower()
+    if host not in _host_limits:
+        _host_limits[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+    return _host_limits[host]
+
+async def fetch_url(url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """GETs a URL through the shared pool, honouring the global and per-host limits."""
+    async with _get_global_limit():
+        async with _get_host_limit(url):
+            return await get_client().get(url, headers=headers)
+
+# Conditional GET cache: source name -> {url, etag, last_modified, body_hash}
+_feed_cache: Dict[str, Dict[str, Optional[str]]] = {}
+_feed_cache_loaded = False
+
+async def load_feed_cache():
+    """Loads the persisted feed validators into memory (once per process)."""
+    global _feed_cache_loaded
+    if _feed_cache_loaded:
+        return
+    db = AsyncSessionLocal()
     try:
-        async with httpx.AsyncClient(timeout=TIMEOUT, headers=HEADERS, follow_redirects=True) as client:
-            response = await client.get(url)
-            if response.status_code != 200:
-                logger.error(f"Failed to fetch RSS for {source_name}: {response.status_code}")
-                return []
-
-            feed = feedparser.parse(response.text)
-            articles = []
-
-            for entry in feed.entries[:limit]:
-                # Extract and clean content
-                content = entry.get('summary', '')
-                if not content and 'content' in entry:
-                    content = entry.content[0].value
-
-                soup = BeautifulSoup(content, 'html.parser')
-                clean_content = soup.get_text(separator=' ').strip()
-
-                articles.append({
-                    'title': entry.get('title', 'No Title'),
-                    'url': entry.get('link', ''),
-                    'content': clean_content[:2000],  # Capped for AI context window
-                    'source': source_name,
-                    'published_at': parse_rss_date(entry.get('published_parsed'))
-                })
-            return articles
+        for row in await db.scalars(select(FeedCache)):
+            _feed_cache[row.source] = {
+                'url': row.url,
+                'etag': row.etag,
+                'last_modified': row.last_modified,
+                'body_hash': row.body_hash
+            }
+        _feed_cache_loaded = True
+    except Exception as e:
+        logger.error(f"Could not load feed cache: {e}")
+    finally:
+        await db.close()
+
+async def save_feed_cache():
+    """Persists the in-memory feed validators next to the articles table.
+
+    Called after the scraped articles are committed, so a failed ingest is refetched.
+    """
+    db = AsyncSessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        for source, entry in _feed_cache.items():
+            await db.merge(FeedCache(source=source, updated_at=now, **entry))
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Could not save feed cache: {e}")
+    finally:
+        await db.close()
+
+def _conditional_headers(source_name: str, url: str) -> Dict[str, str]:
+    cached = _feed_cache.get(source_name)
+    if not cached or cached.get('url') != url:
+        return {}
+    headers = {}
+    if cached.get('etag'):
+        headers['If-None-Match'] = cached['etag']
+    if cached.get('last_modified'):
+        headers['If-Modified-Since'] = cached['last_modified']
+    return headers
+
+def forget_feed(source_name: str):
+    """Drops a source's validators so its next poll refetches and reparses (e.g. after a failed ingest)."""
+    _feed_cache.pop(source_name, None)
+
+async def fetch_feed(url: str, source_name: str) -> Dict[str, Any]:
+    """Conditional GET of one feed.
+
+    Returns {"status", "body", "latency", "error"}; status is one of ok,
+    not_modified, unchanged or error, and `body` is only set for ok. Never raises.
+    """
+    started = time.perf_counter()
+
+    def outcome(status: str, body: Optional[bytes] = None, error: Optional[str] = None):
+        metrics.FEED_FETCHES.inc(source=source_name, status=status)
+        return {"status": status, "body": body, "latency": time.perf_counter() - started, "error": error}
+
+    try:
+        response = await asyncio.wait_for(
+            fetch_url(url, headers=_conditional_headers(source_name, url)),
+            timeout=SOURCE_DEADLINE
+        )
+        metrics.FEED_FETCH_SECONDS.observe(time.perf_counter() - started, source=source_name)
+        metrics.FEED_BYTES.inc(len(response.content), source=source_name)
+        if response.status_code == 304:
+            logger.info(f"{source_name}: not modified, skipping")
+            return outcome("not_modified")
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch RSS for {source_name}: {response.status_code}")
+            return outcome("error", error=f"HTTP {response.status_code}")
+
+        # Skip parsing when the server ignores validators but the body is unchanged
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        cached = _feed_cache.get(source_name) or {}
+        _feed_cache[source_name] = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'body_hash': body_hash
+        }
+        if cached.get('url') == url and cached.get('body_hash') == body_hash:
+            logger.info(f"{source_name}: body unchanged, skipping")
+            return outcome("unchanged")
+        return outcome("ok", response.content)
+    except asyncio.TimeoutError:
+        logger.error(f"Error scraping RSS {source_name}: exceeded {SOURCE_DEADLINE}s deadline")
+        return outcome("error", error=f"Exceeded {SOURCE_DEADLINE}s deadline")
     except Exception as e:
         logger.error(f"Error scraping RSS {source_name}: {str(e)}")
-        return []
-
-# Source-specific scraping functions
-async def scrape_bleepingcomputer(): return await scrape_rss_feed("https://www.bleepingcomputer.com/feed/", "BleepingComputer")
-async def scrape_thehackernews(): return await scrape_rss_feed("https://thehackernews.com/feeds/posts/default", "TheHackerNews")
-async def scrape_securityweek(): return await scrape_rss_feed("https://feeds.feedburner.com/securityweek", "SecurityWeek")
-async def scrape_darkreading(): return await scrape_rss_feed("https://www.darkreading.com/rss.xml", "Dark Reading")
-async def scrape_unit42(): return await scrape_rss_feed("https://unit42.paloaltonetworks.com/feed/", "Unit 42")
-async def scrape_mandiant(): return await scrape_rss_feed("https://www.mandiant.com/resources/blog/rss.xml", "Mandiant")
-async def scrape_zerofox(): return await scrape_rss_feed("https://www.zerofox.com/feed/", "ZeroFox")
-async def scrape_infosecurity(): return await scrape_rss_feed("https://www.infosecurity-magazine.com/rss/news/", "Infosecurity Mag")
-async def scrape_cybersecuritynews(): return await scrape_rss_feed("https://cybersecuritynews.com/feed/", "Cyber Security News")
-async def scrape_infosecnews(): return await scrape_rss_feed("https://infosecnews.org/feed/", "InfoSec News")
-async def scrape_cisa(): return await scrape_rss_feed("https://www.cisa.gov/cybersecurity-advisories.xml", "CISA")
-async def scrape_cybernews(): return await scrape_rss_feed("https://cybernews.com/news/feed/", "Cybernews")
-async def scrape_therecord(): return await scrape_rss_feed("https://therecord.media/feed/", "The Record")
-async def scrape_sans_isc(): return await scrape_rss_feed("https://isc.sans.edu/rssfeed.xml", "SANS ISC")
-async def scrape_krebs(): return await scrape_rss_feed("https://krebsonsecurity.com/feed/", "KrebsOnSecurity")
-async def scrape_talos(): return await scrape_rss_feed("https://blog.talosintelligence.com/feeds/posts/default", "Cisco Talos")
-async def scrape_crowdstrike(): return await scrape_rss_feed("https://www.crowdstrike.com/blog/feed/", "CrowdStrike")
-
-async def scrape_all_sources() -> List[Dict[str, Any]]:
-    """Collects news from all configured sources."""
-    scrapers = [
-        scrape_bleepingcomputer(), scrape_thehackernews(), scrape_securityweek(),
-        scrape_darkreading(), scrape_unit42(), scrape_mandiant(),
-        scrape_zerofox(), scrape_infosecurity(), scrape_cybersecuritynews(),
-        scrape_infosecnews(), scrape_cisa(), scrape_cybernews(),
-        scrape_therecord(), scrape_sans_isc(), scrape_krebs(),
-        scrape_talos(), scrape_crowdstrike()
-    ]
-
-    all_articles = []
-    for scraper_task in scrapers:
-        try:
-            articles = await scraper_task
-            all_articles.extend(articles)
-        except Exception as e:
-            logger.error(f"Scraper error: {e}")
-
-    return all_articles
+        return outcome("error", error=str(e) or type(e).__name__)
+
+async def parse_feed_body(body: bytes, source_name: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Parses a fetched feed in the worker pool, off the event loop."""
+    with metrics.FEED_PARSE_SECONDS.time(source=source_name):
+        return await _get_parse_batcher().parse(body, source_name, limit)
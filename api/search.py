@@ -0,0 +1,90 @@
+import re
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, func, text, table, column, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Article
+from schemas import LIST_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# BM25 column weights: title, content, summary
+BM25_WEIGHTS = (10.0, 1.0, 4.0)
+SNIPPET_TOKENS = 16
+SNIPPET_MARK = ("<mark>", "</mark>")
+
+articles_fts = table("articles_fts", column("rowid"))
+_fts = literal_column("articles_fts")
+
+# "quoted phrases", bare terms and prefix* terms
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+def build_match_query(q: str) -> str:
+    """Turns free text into a safe FTS5 MATCH expression.
+
+    Every term is quoted so user input can't inject FTS syntax; terms are
+    ANDed, "phrases" stay phrases and a trailing * keeps prefix matching.
+    """
+    parts = []
+    for phrase, word in _TERM_RE.findall(q or ""):
+        if phrase:
+            tokens = _WORD_RE.findall(phrase)
+            if tokens:
+                parts.append('"' + " ".join(tokens) + '"')
+            continue
+        prefix = word.endswith("*")
+        # Tokens split the same way the index does (e.g. CVE-2024-1234 -> a phrase)
+        tokens = _WORD_RE.findall(word)
+        if not tokens:
+            continue
+        parts.append('"' + " ".join(tokens) + '"' + ("*" if prefix else ""))
+    if not parts:
+        raise HTTPException(status_code=400, detail="Empty search query")
+    return " ".join(parts)
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+async def search_articles(db: AsyncSession, q: str, source: Optional[str] = None,
+                          category: Optional[str] = None, severity: Optional[str] = None,
+                          since: Optional[datetime] = None, until: Optional[datetime] = None,
+                          limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """BM25-ranked matches with highlighted snippets, filtered and paginated."""
+    score = func.bm25(_fts, *BM25_WEIGHTS).label("score")
+    snippet = func.snippet(_fts, -1, SNIPPET_MARK[0], SNIPPET_MARK[1], "…", SNIPPET_TOKENS).label("snippet")
+    columns = [Article.__table__.c[name] for name in LIST_FIELDS]
+
+    query = (
+        select(*columns, snippet, score)
+        .select_from(articles_fts.join(Article, Article.id == articles_fts.c.rowid))
+        .where(text("articles_fts MATCH :match"))
+    )
+    if source:
+        query = query.where(Article.source == source)
+    if category:
+        query = query.where(Article.category == category)
+    if severity:
+        query = query.where(Article.severity == severity)
+    if since:
+        query = query.where(Article.published_at >= _naive_utc(since))
+    if until:
+        query = query.where(Article.published_at < _naive_utc(until))
+
+    rows = (await db.execute(
+        query.order_by(score, Article.id.desc()).limit(limit + 1).offset(offset),
+        {"match": build_match_query(q)}
+    )).mappings().all()
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+    items: List[Dict[str, Any]] = [dict(row) for row in rows]
+    return {"items": items, "next_offset": next_offset}
@@ -0,0 +1,163 @@
+import os
+import json
+import math
+import random
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import AsyncSessionLocal, SourceState
+
+logger = logging.getLogger(__name__)
+
+# Feed list lives in data, not code
+SOURCES_FILE = os.getenv("SOURCES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sources.json"))
+
+# Adaptive polling (seconds)
+SOURCE_TICK = int(os.getenv("SOURCE_TICK", "60"))                   # How often due sources are checked
+MIN_INTERVAL = float(os.getenv("SOURCE_MIN_INTERVAL", "600"))       # Busiest feeds
+MAX_INTERVAL = float(os.getenv("SOURCE_MAX_INTERVAL", "21600"))     # Quietest feeds
+MAX_BACKOFF = float(os.getenv("SOURCE_MAX_BACKOFF", "43200"))       # Cap for failing feeds
+DEFAULT_INTERVAL = 3600.0                                           # Until a rate has been observed
+TARGET_ITEMS_PER_POLL = 2.0   # Poll often enough to see ~2 new items each time
+RATE_TIME_CONSTANT = 12.0     # Hours; an observation's weight grows with the span it covers
+JITTER = 0.1                  # +/-10% so sources drift apart instead of firing together
+
+STATE_FIELDS = [c.name for c in SourceState.__table__.columns]
+
+def load_sources(path: str = SOURCES_FILE) -> List[Dict[str, Any]]:
+    """Enabled feeds from the registry file: [{name, url, limit}]."""
+    with open(path) as f:
+        entries = json.load(f)
+    return [
+        {"name": e["name"], "url": e["url"], "limit": int(e.get("limit", 10))}
+        for e in entries if e.get("enabled", True)
+    ]
+
+SOURCES = load_sources()
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def adaptive_interval(items_per_hour: Optional[float]) -> float:
+    """Seconds between polls for a feed publishing `items_per_hour` new articles."""
+    if items_per_hour is None:
+        return DEFAULT_INTERVAL
+    if items_per_hour <= 0:
+        return MAX_INTERVAL
+    return min(max(TARGET_ITEMS_PER_POLL / items_per_hour * 3600, MIN_INTERVAL), MAX_INTERVAL)
+
+def backoff_interval(error_streak: int) -> float:
+    """Exponential backoff for a failing feed: 10m, 20m, 40m ... capped at MAX_BACKOFF."""
+    return min(MIN_INTERVAL * 2 ** max(error_streak - 1, 0), MAX_BACKOFF)
+
+class SourceRegistry:
+    """Per-source schedule and health, driven by what each poll returned.
+
+    Healthy feeds are polled at a rate derived from how many new articles they
+    produce; failing feeds back off exponentially. State is persisted in
+    source_state so it survives restarts and is visible to every worker.
+    """
+
+    def __init__(self, sources: List[Dict[str, Any]] = SOURCES):
+        self.sources = {s["name"]: s for s in sources}
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self.in_flight: Set[str] = set()
+
+    def _default_state(self, name: str, now: datetime) -> Dict[str, Any]:
+        state = dict.fromkeys(STATE_FIELDS)
+        state.update(name=name, url=self.sources[name]["url"], interval=DEFAULT_INTERVAL, next_run_at=now,
+                     error_streak=0, last_new_items=0, fetches=0, failures=0)
+        return state
+
+    async def load(self):
+        """Restores persisted schedules; new sources are due immediately."""
+        now = _utcnow()
+        async with AsyncSessionLocal() as db:
+            rows = {row.name: row for row in await db.scalars(select(SourceState))}
+        self.state = {}
+        for name, source in self.sources.items():
+            row = rows.get(name)
+            if row is None or row.url != source["url"]:
+                self.state[name] = self._default_state(name, now)
+            else:
+                self.state[name] = {field: getattr(row, field) for field in STATE_FIELDS}
+
+    def due(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        now = now or _utcnow()
+        due = []
+        for name, source in self.sources.items():
+            state = self.state.setdefault(name, self._default_state(name, now))
+            if name not in self.in_flight and state["next_run_at"] <= now:
+                due.append(source)
+        return due
+
+    def record(self, name: str, outcome: Dict[str, Any], new_items: int, now: Optional[datetime] = None):
+        """Updates health and reschedules a source after a poll."""
+        if name not in self.sources:
+            return
+        now = now or _utcnow()
+        state = self.state.setdefault(name, self._default_state(name, now))
+        state["last_run_at"] = now
+        state["last_status"] = outcome["status"]
+        state["latency_ms"] = round(outcome["latency"] * 1000, 1)
+        state["fetches"] = (state["fetches"] or 0) + 1
+
+        if outcome["status"] == "error":
+            state["error_streak"] = (state["error_streak"] or 0) + 1
+            state["failures"] = (state["failures"] or 0) + 1
+            state["last_error"] = outcome.get("error")
+            interval = backoff_interval(state["error_streak"])
+        else:
+            previous = state["last_success_at"]
+            if previous is not None:
+                hours = max((now - previous).total_seconds() / 3600, 1 / 60)
+                observed = new_items / hours
+                rate = state["items_per_hour"]
+                # Time-weighted EWMA: a manual refresh a minute later barely moves the estimate
+                weight = 1 - math.exp(-hours / RATE_TIME_CONSTANT)
+                state["items_per_hour"] = observed if rate is None else weight * observed + (1 - weight) * rate
+            state.update(error_streak=0, last_error=outcome.get("error"), last_success_at=now, last_new_items=new_items)
+            interval = adaptive_interval(state["items_per_hour"])
+            # A full feed page of new items means we may have missed some: come back soon
+            if previous is not None and new_items >= self.sources[name]["limit"]:
+                interval = MIN_INTERVAL
+
+        interval *= random.uniform(1 - JITTER, 1 + JITTER)
+        state["interval"] = round(interval, 1)
+        state["next_run_at"] = now + timedelta(seconds=interval)
+
+    async def save(self, names: Optional[Iterable[str]] = None):
+        rows = [self.state[n] for n in (names if names is not None else self.state) if n in self.state]
+        if not rows:
+            return
+        stmt = insert(SourceState).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SourceState.name],
+            set_={field: stmt.excluded[field] for field in STATE_FIELDS if field != "name"}
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+async def source_health(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Registry order, with persisted health (works on any worker)."""
+    rows = {row.name: row for row in await db.scalars(select(SourceState))}
+    health = []
+    for source in SOURCES:
+        row = rows.get(source["name"])
+        entry = {"name": source["name"], "url": source["url"]}
+        for field in STATE_FIELDS:
+            if field in entry:
+                continue
+            entry[field] = getattr(row, field) if row is not None else None
+        if row is None:
+            entry["last_status"] = "pending"
+        health.append(entry)
+    return health
+
+source_registry = SourceRegistry()
@@ -1,8 +1,16 @@
 import os
+import time
+import random
+import asyncio
 from google import genai
-from google.genai import types
+from google.genai import types, errors
 from dotenv import load_dotenv
+import re
+import json
 import logging
+from typing import Dict, List, Optional, Tuple
+
+import metrics
 
 # Load environment variables
 load_dotenv()
@@ -13,6 +21,33 @@ logger = logging.getLogger(__name__)
 
 # Constants
 MODEL_ID = 'gemini-2.0-flash'
+
+# Quota and retry settings (defaults match the free-tier 5 RPM limit)
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "5"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "250000"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "2.0"))  # Seconds, doubled per retry
+OUTPUT_TOKEN_ESTIMATE = 300  # Reserved per request for the 3-bullet response
+
+# Batched mode: several articles per request, bounded by an input token budget
+BATCH_TOKEN_BUDGET = int(os.getenv("SUMMARY_BATCH_TOKEN_BUDGET", "8000"))
+BATCH_MAX_ARTICLES = int(os.getenv("SUMMARY_BATCH_MAX_ARTICLES", "8"))
+
+# Bump whenever SUMMARY_PROMPT/BATCH_PROMPT change meaningfully; invalidates cached summaries
+PROMPT_VERSION = "2"
+
+# Results that mean "try again later" rather than a real summary
+FAILURE_PREFIXES = ("Summarization failed.", "AI Summarization unavailable.", "Summary unavailable from AI.")
+
+CATEGORIES = ["Ransomware", "Vulnerability", "Data Breach", "Malware", "Policy/Legal", "General"]
+SEVERITIES = ["Low", "Medium", "High", "Critical"]
+
+SAFETY_SETTINGS = [
+    types.SafetySetting(category='HARM_CATEGORY_HARASSMENT', threshold='BLOCK_NONE'),
+    types.SafetySetting(category='HARM_CATEGORY_HATE_SPEECH', threshold='BLOCK_NONE'),
+    types.SafetySetting(category='HARM_CATEGORY_SEXUALLY_EXPLICIT', threshold='BLOCK_NONE'),
+    types.SafetySetting(category='HARM_CATEGORY_DANGEROUS_CONTENT', threshold='BLOCK_NONE'),
+]
 SUMMARY_PROMPT = """You are a cybersecurity expert. Analyze the following news article:
 {content}
 
@@ -39,38 +74,283 @@ SUMMARY:
 • [Point 2]
 • [Point 3]"""
 
+class TokenBucket:
+    """Classic token bucket: `capacity` tokens, refilled continuously over `period` seconds."""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+class RateLimiter:
+    """Shared RPM + TPM limiter for all Gemini calls in this process."""
+
+    def __init__(self, rpm: int = GEMINI_RPM, tpm: int = GEMINI_TPM):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self, tokens: int):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Callers are served in order; each waits for both buckets
+        async with self._lock:
+            while True:
+                delay = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+
+    def penalize(self):
+        """Drains the request bucket after a 429 so every caller backs off."""
+        self.requests._refill()
+        self.requests.tokens = min(self.requests.tokens, 0)
+
+limiter = RateLimiter()
+
+_client: Optional[genai.Client] = None
+
+def get_client() -> Optional[genai.Client]:
+    """Returns the persistent Gemini client, or None if no API key is configured."""
+    global _client
+    if _client is None:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            return None
+        _client = genai.Client(api_key=api_key)
+    return _client
+
+def estimate_tokens(text: str, output_tokens: int = OUTPUT_TOKEN_ESTIMATE) -> int:
+    """Rough prompt size (~4 chars per token) plus the expected output."""
+    return len(text) // 4 + output_tokens
+
+def _is_rate_limited(e: Exception) -> bool:
+    return isinstance(e, errors.APIError) and (e.code == 429 or e.status == 'RESOURCE_EXHAUSTED')
+
+async def generate(prompt: str, json_output: bool = False, output_tokens: int = OUTPUT_TOKEN_ESTIMATE) -> Optional[str]:
+    """Rate-limited async Gemini call with exponential backoff on 429s.
+
+    Raises on missing API key and on non-retryable errors.
+    """
+    client = get_client()
+    if client is None:
+        raise RuntimeError("GEMINI_API_KEY not found in environment.")
+
+    config = types.GenerateContentConfig(
+        safety_settings=SAFETY_SETTINGS,
+        response_mime_type='application/json' if json_output else None
+    )
+    for attempt in range(MAX_RETRIES + 1):
+        await limiter.acquire(estimate_tokens(prompt, output_tokens))
+        started = time.perf_counter()
+        try:
+            response = await client.aio.models.generate_content(
+                model=MODEL_ID,
+                contents=prompt,
+                config=config
+            )
+            metrics.GEMINI_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+            return response.text if response else None
+        except Exception as e:
+            rate_limited = _is_rate_limited(e)
+            metrics.GEMINI_REQUEST_SECONDS.observe(time.perf_counter() - started, outcome="rate_limited" if rate_limited else "error")
+            if rate_limited:
+                metrics.GEMINI_RATE_LIMITED.inc()
+            if not rate_limited or attempt == MAX_RETRIES:
+                raise
+            limiter.penalize()
+            delay = BACKOFF_BASE * (2 ** attempt) + random.uniform(0, 1)
+            logger.warning(f"Gemini rate limited, retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+            await asyncio.sleep(delay)
+
 async def summarize_article(content: str) -> str:
     """Summarizes a cybersecurity news article using Gemini 2.0 Flash."""
     if not content:
         return "No content available for summarization."
 
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
+    if get_client() is None:
         logger.error("GEMINI_API_KEY not found in environment.")
         return "AI Summarization unavailable. Please check your GEMINI_API_KEY."
 
     try:
-        client = genai.Client(api_key=api_key)
-        prompt = SUMMARY_PROMPT.format(content=content)
-
-        response = client.models.generate_content(
-            model=MODEL_ID,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                safety_settings=[
-                    types.SafetySetting(category='HARM_CATEGORY_HARASSMENT', threshold='BLOCK_NONE'),
-                    types.SafetySetting(category='HARM_CATEGORY_HATE_SPEECH', threshold='BLOCK_NONE'),
-                    types.SafetySetting(category='HARM_CATEGORY_SEXUALLY_EXPLICIT', threshold='BLOCK_NONE'),
-                    types.SafetySetting(category='HARM_CATEGORY_DANGEROUS_CONTENT', threshold='BLOCK_NONE'),
-                ]
-            )
-        )
-
-        if not response or not response.text:
+        text = await generate(SUMMARY_PROMPT.format(content=content))
+        if not text:
             return "Summary unavailable from AI."
 
-        return response.text
+        return text
 
     except Exception as e:
         logger.error(f"Gemini Summarization Error: {e}")
         return f"Summarization failed. Error: {str(e)}"
+
+def _match_choice(value: str, choices: List[str]) -> Optional[str]:
+    """Case-insensitive match against an allowed list (tolerates brackets/markdown)."""
+    cleaned = re.sub(r'[\[\]*`"]', '', value or '').strip().lower()
+    for choice in choices:
+        if cleaned == choice.lower():
+            return choice
+    return None
+
+_FIELD_RE = re.compile(r'^\s*\**\s*(CATEGORY|SEVERITY)\s*\**\s*:\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+_SUMMARY_RE = re.compile(r'^\s*\**\s*SUMMARY\s*\**\s*:\s*', re.IGNORECASE | re.MULTILINE)
+
+def is_failure(raw_output: Optional[str]) -> bool:
+    return not raw_output or raw_output.startswith(FAILURE_PREFIXES)
+
+def parse_summary(raw_output: str) -> Tuple[str, str, str]:
+    """Splits single-article model output into (category, severity, summary).
+
+    Unknown categories or severities fall back to General/Medium.
+    """
+    category, severity, summary = "General", "Medium", (raw_output or "").strip()
+    for field, value in _FIELD_RE.findall(raw_output or ""):
+        if field.upper() == "CATEGORY":
+            category = _match_choice(value, CATEGORIES) or category
+        else:
+            severity = _match_choice(value, SEVERITIES) or severity
+    marker = _SUMMARY_RE.search(raw_output or "")
+    if marker and raw_output[marker.end():].strip():
+        summary = raw_output[marker.end():].strip()
+    return category, severity, summary
+
+BATCH_PROMPT = """You are a cybersecurity expert. Analyze each of the news articles below independently.
+
+For EVERY article:
+1. "category": exactly one of: Ransomware, Vulnerability, Data Breach, Malware, Policy/Legal, General.
+   - Ransomware: extortion/lock-up attacks. Vulnerability: bugs, CVEs, zero-days.
+   - Data Breach: leaks and stolen info. Malware: viruses, trojans, botnets.
+   - Policy/Legal: laws, arrests, government regulation. General: only if none fit.
+2. "severity": exactly one of: Low, Medium, High, Critical.
+   - Critical: active wide-scale exploits, major infrastructure hits.
+   - High: confirmed breaches of large orgs, new zero-days.
+   - Medium: general malware news, patched vulnerabilities.
+   - Low: policy news, minor updates.
+3. "summary": exactly 3 punchy bullet points (strings) on impact and technical details.
+
+Respond ONLY with a JSON array, one object per article, using the article id given:
+[{{"id": <id>, "category": "...", "severity": "...", "summary": ["...", "...", "..."]}}]
+
+Articles:
+{articles}"""
+
+def build_batches(items: List[Tuple[int, str]], token_budget: int = BATCH_TOKEN_BUDGET,
+                  max_articles: int = BATCH_MAX_ARTICLES) -> List[List[Tuple[int, str]]]:
+    """Greedily packs (id, content) pairs into request-sized batches."""
+    batches: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    used = 0
+    for article_id, content in items:
+        cost = len(content or "") // 4 + 20
+        if current and (used + cost > token_budget or len(current) >= max_articles):
+            batches.append(current)
+            current, used = [], 0
+        current.append((article_id, content))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _format_summary(value) -> Optional[str]:
+    if isinstance(value, list):
+        points = [str(p).strip().lstrip('•-* ').strip() for p in value if str(p).strip()]
+        return "\n".join(f"• {p}" for p in points) if points else None
+    if isinstance(value, str) and value.strip():
+        return value.strip()
+    return None
+
+def parse_batch_response(raw_output: str, expected_ids: List[int]) -> Optional[Dict[int, Tuple[str, str, str]]]:
+    """Validates a batched JSON response, returning results only for well-formed items.
+
+    Ids not in the returned dict failed validation and should be retried singly.
+    None means the response as a whole was empty or not a JSON list of items.
+    """
+    text = (raw_output or "").strip()
+    # Tolerate a fenced code block around the JSON
+    fenced = re.match(r'^```(?:json)?\s*(.*?)\s*```$', text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        data = json.loads(text)
+    except (ValueError, TypeError):
+        return None
+    if isinstance(data, dict):
+        data = data.get("articles", data.get("results", [data]))
+    if not isinstance(data, list):
+        return None
+
+    expected = set(expected_ids)
+    results: Dict[int, Tuple[str, str, str]] = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        try:
+            article_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        category = _match_choice(str(item.get("category", "")), CATEGORIES)
+        severity = _match_choice(str(item.get("severity", "")), SEVERITIES)
+        summary = _format_summary(item.get("summary"))
+        if article_id in expected and category and severity and summary:
+            results[article_id] = (category, severity, summary)
+    return results
+
+async def summarize_batch(items: List[Tuple[int, str]]) -> Dict[int, Optional[Tuple[str, str, str]]]:
+    """Summarizes several articles in one request.
+
+    Returns (category, severity, summary) per id, or None where summarization
+    failed and should be retried later. If the request itself fails (quota
+    exhausted after backoff, network), the whole batch is left for a later
+    pass instead of multiplying requests. An unusable response is split in
+    half and retried, so one article that derails the model only costs its
+    batchmates a few extra calls; items a valid response does not cover are
+    retried with single-article calls.
+    """
+    results: Dict[int, Optional[Tuple[str, str, str]]] = {}
+    batchable = [(i, c) for i, c in items if c]
+
+    if len(batchable) > 1 and get_client() is not None:
+        articles = "\n\n".join(f"### Article id={article_id}\n{content}" for article_id, content in batchable)
+        try:
+            raw_output = await generate(
+                BATCH_PROMPT.format(articles=articles),
+                json_output=True,
+                output_tokens=OUTPUT_TOKEN_ESTIMATE * len(batchable)
+            )
+        except Exception as e:
+            logger.error(f"Gemini batch summarization error: {e}; leaving {len(batchable)} items for the next pass.")
+            return {article_id: None for article_id, _ in items}
+
+        parsed = parse_batch_response(raw_output, [i for i, _ in batchable])
+        if parsed is None:
+            half = len(batchable) // 2
+            logger.warning(f"Unusable batch response for {len(batchable)} items, splitting into {half} + {len(batchable) - half}.")
+            results.update(await summarize_batch(batchable[:half]))
+            results.update(await summarize_batch(batchable[half:]))
+        else:
+            results.update(parsed)
+            if len(results) < len(batchable):
+                logger.warning(f"Batch returned {len(results)}/{len(batchable)} valid items, falling back to single calls.")
+
+    # Single-article fallback for anything the batch response missed
+    for article_id, content in items:
+        if article_id not in results:
+            raw_output = await summarize_article(content)
+            results[article_id] = None if is_failure(raw_output) else parse_summary(raw_output)
+    return results
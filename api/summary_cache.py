@@ -0,0 +1,83 @@
+import os
+import re
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import SummaryCache
+from summarizer import MODEL_ID, PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Eviction limits
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "20000"))
+SUMMARY_CACHE_MAX_AGE_DAYS = int(os.getenv("SUMMARY_CACHE_MAX_AGE_DAYS", "30"))
+
+# Syndication boilerplate that differs between reposts of the same story
+_BOILERPLATE_RE = re.compile(
+    r'the post .{0,300}? appeared first on .{0,120}?$|read more\s*»?$|continue reading.{0,80}$',
+    re.IGNORECASE
+)
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+def normalize_content(content: str) -> str:
+    """Folds case, punctuation, whitespace and repost boilerplate."""
+    text = _BOILERPLATE_RE.sub(' ', (content or '').strip())
+    return _NON_WORD_RE.sub(' ', text.lower()).strip()
+
+def content_key(content: str) -> str:
+    """Cache key: normalized content plus the prompt and model it was summarized with."""
+    digest = hashlib.sha256()
+    digest.update(f"{MODEL_ID}\0{PROMPT_VERSION}\0".encode())
+    digest.update(normalize_content(content).encode())
+    return digest.hexdigest()
+
+async def lookup(db: AsyncSession, keys: Iterable[str]) -> Dict[str, Tuple[str, str, str]]:
+    """Returns cached (category, severity, summary) for any of the given keys.
+
+    Read-only; record the hits with touch() in the transaction that stores
+    the results, so no write lock is taken while the model is called.
+    """
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    rows = (await db.scalars(select(SummaryCache).where(SummaryCache.key.in_(keys)))).all()
+    return {r.key: (r.category, r.severity, r.summary) for r in rows}
+
+async def touch(db: AsyncSession, keys: Iterable[str]):
+    """Counts a hit and refreshes last_used_at (LRU) for the given keys."""
+    keys = list(set(keys))
+    if keys:
+        await db.execute(
+            update(SummaryCache)
+            .where(SummaryCache.key.in_(keys))
+            .values(hits=SummaryCache.hits + 1, last_used_at=datetime.now(timezone.utc))
+        )
+
+async def store(db: AsyncSession, results: Dict[str, Optional[Tuple[str, str, str]]]):
+    """Caches successful results; failures (None) are never cached."""
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"key": key, "category": r[0], "severity": r[1], "summary": r[2], "hits": 0,
+         "created_at": now, "last_used_at": now}
+        for key, r in results.items() if r is not None
+    ]
+    if rows:
+        await db.execute(insert(SummaryCache).values(rows).on_conflict_do_nothing(index_elements=["key"]))
+
+async def evict(db: AsyncSession) -> int:
+    """Drops entries unused for SUMMARY_CACHE_MAX_AGE_DAYS, then trims to SUMMARY_CACHE_MAX_ENTRIES (LRU)."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=SUMMARY_CACHE_MAX_AGE_DAYS)
+    removed = (await db.execute(delete(SummaryCache).where(SummaryCache.last_used_at < cutoff))).rowcount
+
+    keep = select(SummaryCache.key).order_by(SummaryCache.last_used_at.desc()).limit(SUMMARY_CACHE_MAX_ENTRIES)
+    removed += (await db.execute(delete(SummaryCache).where(SummaryCache.key.not_in(keep)))).rowcount
+    await db.commit()
+    if removed:
+        logger.info(f"Evicted {removed} summary cache entries.")
+    return removed
@@ -0,0 +1,184 @@
+import os
+import asyncio
+import itertools
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from models import AsyncSessionLocal, Article
+from summarizer import summarize_batch, build_batches, BATCH_MAX_ARTICLES
+import summary_cache
+from analytics import record_reclassified
+from entities import record_entities
+from ingest import article_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Worker pool tuning
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "3"))
+
+# Queue priorities (lower runs first)
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+
+PRIORITY_SOURCES = {"CISA"}
+URGENT_KEYWORDS = ("breaking", "critical", "zero-day", "0-day", "actively exploited", "emergency directive")
+
+def article_priority(source: str, title: str, severity: Optional[str] = None) -> int:
+    """CISA advisories, Critical items and breaking news jump the queue."""
+    if source in PRIORITY_SOURCES or severity == "Critical":
+        return PRIORITY_URGENT
+    lowered = (title or "").lower()
+    if any(k in lowered for k in URGENT_KEYWORDS):
+        return PRIORITY_URGENT
+    return PRIORITY_NORMAL
+
+class SummarizationService:
+    """Long-running pool of async workers draining a priority queue of article ids.
+
+    Throughput is bounded by the shared Gemini rate limiter in summarizer.py,
+    not by fixed sleeps, so workers stay busy right up to the quota.
+    """
+
+    def __init__(self, publish: Callable[[dict], Awaitable[None]], workers: int = SUMMARY_WORKERS):
+        self.publish = publish
+        self.workers = workers
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self._queued: Set[int] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self.running:
+            return
+        self.queue = asyncio.PriorityQueue()
+        self._queued.clear()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"Summarization service started with {self.workers} workers.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, article_id: int, priority: int = PRIORITY_NORMAL):
+        """Queues an article for summarization (no-op if already queued)."""
+        if self.queue is None or article_id in self._queued:
+            return
+        self._queued.add(article_id)
+        self.queue.put_nowait((priority, next(self._seq), article_id))
+
+    async def enqueue_backlog(self, limit: int = 500) -> int:
+        """Queues unsummarized rows, e.g. after a restart or a missed enqueue."""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Article.id, Article.source, Article.title, Article.severity)
+                .where(Article.summary.is_(None))
+                .order_by(Article.created_at.desc())
+                .limit(limit)
+            )).all()
+        for article_id, source, title, severity in rows:
+            self.enqueue(article_id, article_priority(source, title, severity))
+        return len(rows)
+
+    async def _next_batch(self) -> List[int]:
+        """Waits for one id, then greedily takes more that are already queued."""
+        _, _, article_id = await self.queue.get()
+        batch = [article_id]
+        while len(batch) < BATCH_MAX_ARTICLES:
+            try:
+                _, _, article_id = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            batch.append(article_id)
+        return batch
+
+    async def _worker(self, n: int):
+        while True:
+            batch = await self._next_batch()
+            deferred: List[Article] = []
+            try:
+                deferred = await self.summarize_many(batch)
+            except Exception as e:
+                logger.error(f"Summarization worker {n} failed on articles {batch}: {e}")
+            finally:
+                for article_id in batch:
+                    self._queued.discard(article_id)
+                    self.queue.task_done()
+            # Whatever did not fit the token budget goes back on the queue
+            for article in deferred:
+                self.enqueue(article.id, article_priority(article.source, article.title, article.severity))
+
+    async def summarize_many(self, article_ids: List[int]) -> List[Article]:
+        """Summarizes as many of the given articles as fit one request.
+
+        Articles whose content is already in the summary cache are filled in
+        without an API call. Returns the articles left over for a later batch.
+        """
+        async with AsyncSessionLocal() as db:
+            articles = (await db.scalars(
+                select(Article).where(Article.id.in_(article_ids), Article.summary.is_(None))
+            )).all()
+            if not articles:
+                return []
+
+            by_id = {a.id: a for a in articles}
+            keys = {a.id: summary_cache.content_key(a.content) for a in articles}
+            cached = await summary_cache.lookup(db, keys.values())
+
+            # One API item per distinct uncached content; reposts share its result
+            representatives: Dict[str, int] = {}
+            for article_id in article_ids:
+                if article_id in by_id and keys[article_id] not in cached:
+                    representatives.setdefault(keys[article_id], article_id)
+
+            # End the read transaction: nothing may stay open across the model call
+            await db.commit()
+
+            deferred: List[Article] = []
+            fresh: Dict[str, Optional[Tuple[str, str, str]]] = {}
+            if representatives:
+                batches = build_batches([(i, by_id[i].content) for i in representatives.values()])
+                items = batches[0]
+                deferred_keys = {keys[i] for batch in batches[1:] for i, _ in batch}
+                deferred = [a for a in articles if keys[a.id] in deferred_keys]
+
+                queued = self.queue.qsize() if self.queue is not None else 0
+                await self.publish({"status_update": f"AI Analyzing {len(items)} items ({queued} queued): {by_id[items[0][0]].title[:30]}..."})
+                results = await summarize_batch(items)
+                fresh = {keys[i]: results[i] for i, _ in items}
+                await summary_cache.store(db, fresh)
+
+            done: List[Article] = []
+            reclassified = []
+            for article in articles:
+                result = cached.get(keys[article.id]) or fresh.get(keys[article.id])
+                if result is None:
+                    # Failed or deferred: stays NULL and is retried later
+                    continue
+                reclassified.append((article.created_at, article.source, article.category, article.severity, result[0], result[1]))
+                article.category, article.severity, article.summary = result
+                done.append(article)
+            await summary_cache.touch(db, cached)
+            await db.run_sync(record_reclassified, reclassified)
+            # Title and content were indexed at ingest; add what only the summary names.
+            # Every result here came from this exact content, never from a cluster sibling.
+            await db.run_sync(record_entities, [
+                {"id": a.id, "summary": a.summary, "url": a.url, "created_at": a.created_at} for a in done
+            ])
+            await db.commit()
+
+            if cached:
+                logger.info(f"Summary cache: {sum(1 for a in articles if keys[a.id] in cached)} hits of {len(articles)}.")
+
+            # Push updates to UI
+            for article in done:
+                await self.publish(article_to_dict(article))
+
+            return deferred
@@ -0,0 +1,460 @@
+"""Offline benchmark suite: no network, no Gemini key.
+
+    python bench/run.py                                  # default profile, JSON on stdout
+    python bench/run.py --profile full -o after.json     # 10k-1M row read scenarios
+    python bench/run.py --compare before.json after.json
+
+Runs against a throwaway database in a temp directory. Feeds come from
+bench/fixtures.py (recorded snapshots or synthetic feeds on localhost) and
+summarization from bench/fake_llm.py.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import asyncio
+import logging
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.append(BENCH_DIR)
+sys.path.append(os.path.join(ROOT, "api"))
+
+logger = logging.getLogger("bench")
+
+# Load profiles; any value can be overridden from the command line
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "smoke": {
+        "cold_starts": 3, "cycles": 3, "new_per_round": 2, "feed_latency": 0.0, "feed_jitter": 0.0, "error_rate": 0.0,
+        "llm_latency": 0.05, "ingest_rows": 2000, "ingest_batch": 500,
+        "rows": [10_000], "today_rows": 300, "requests": 20, "history_pages": 5,
+        "subscribers": [10, 100], "events": 200,
+    },
+    "default": {
+        "cold_starts": 5, "cycles": 5, "new_per_round": 2, "feed_latency": 0.05, "feed_jitter": 0.02, "error_rate": 0.0,
+        "llm_latency": 0.5, "ingest_rows": 20_000, "ingest_batch": 500,
+        "rows": [10_000, 100_000], "today_rows": 300, "requests": 50, "history_pages": 20,
+        "subscribers": [100, 1000], "events": 1000,
+    },
+    "full": {
+        "cold_starts": 10, "cycles": 10, "new_per_round": 2, "feed_latency": 0.2, "feed_jitter": 0.1, "error_rate": 0.05,
+        "llm_latency": 1.0, "ingest_rows": 100_000, "ingest_batch": 500,
+        "rows": [10_000, 100_000, 1_000_000], "today_rows": 300, "requests": 100, "history_pages": 50,
+        "subscribers": [100, 1000, 5000], "events": 2000,
+    },
+}
+
+SCENARIOS = ["cold_start", "fetch_cycle", "summarize", "ingest", "read_latency", "sse_fanout"]
+
+def latency_stats(samples: List[float]) -> Dict[str, Any]:
+    """Milliseconds: n, mean and p50/p95/p99/max."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(int(p * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {"n": len(ordered), "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "max_ms": round(ordered[-1] * 1000, 3)}
+
+def git_revision() -> Optional[Dict[str, Any]]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def configure_environment(workdir: str):
+    """Points the app at a scratch database; must run before any api module is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["ARCHIVE_DIR"] = os.path.join(workdir, "archive")
+    os.environ["COORDINATION"] = "none"
+    os.environ.setdefault("PROFILE_DIR", os.path.join(workdir, "profiles"))
+    os.chdir(workdir)
+
+class Bench:
+    def __init__(self, profile: Dict[str, Any], fixtures_dir: Optional[str]):
+        import main
+        self.main = main
+        self.p = profile
+        self.fixtures_dir = fixtures_dir
+
+    def count_articles(self) -> int:
+        from sqlalchemy import func, select
+        from models import SessionLocal, Article
+        with SessionLocal() as db:
+            return db.scalar(select(func.count(Article.id)))
+
+    async def cold_start(self) -> Dict[str, Any]:
+        """Import time of each ASGI entry point in a fresh interpreter (serverless cold start)."""
+        probe = "import sys, time; sys.path.insert(0, sys.argv[1]); t = time.perf_counter(); __import__(sys.argv[2]); print(time.perf_counter() - t)"
+
+        def measure(module: str) -> List[float]:
+            samples = []
+            for _ in range(self.p["cold_starts"]):
+                out = subprocess.run([sys.executable, "-c", probe, ROOT, module], capture_output=True, text=True, check=True)
+                samples.append(float(out.stdout.strip().splitlines()[-1]))
+            return samples
+
+        return {module: latency_stats(await asyncio.to_thread(measure, module)) for module in ("api.index", "api.main")}
+
+    async def fetch_cycle(self) -> Dict[str, Any]:
+        """End-to-end fetch_intel_cycle against the local fixture servers."""
+        from fixtures import FixtureServer
+        from sources import SOURCES
+
+        server = FixtureServer(SOURCES, self.p["feed_latency"], self.p["feed_jitter"], self.p["error_rate"],
+                               self.fixtures_dir)
+        sources = server.start()
+        timings, first_article, new_articles = [], [], []
+        first_seen: List[float] = []
+
+        def on_event(msg: dict):
+            if "id" in msg and not first_seen:
+                first_seen.append(time.perf_counter())
+
+        self.main.publisher.listeners.append(on_event)
+        try:
+            for n in range(self.p["cycles"]):
+                if n:
+                    server.advance(self.p["new_per_round"])
+                before = self.count_articles()
+                first_seen.clear()
+                started = time.perf_counter()
+                await self.main.fetch_intel_cycle(sources)
+                timings.append(time.perf_counter() - started)
+                if first_seen:
+                    first_article.append(first_seen[0] - started)
+                new_articles.append(self.count_articles() - before)
+
+            # Nothing published since the last poll: conditional GETs only
+            started = time.perf_counter()
+            await self.main.fetch_intel_cycle(sources)
+            idle = time.perf_counter() - started
+        finally:
+            self.main.publisher.listeners.remove(on_event)
+            server.stop()
+        return {
+            "sources": len(sources),
+            "recorded_fixtures": server.recorded,
+            "first_cycle_ms": round(timings[0] * 1000, 3),
+            "cycles": latency_stats(timings[1:]),
+            "first_article": latency_stats(first_article),
+            "idle_cycle_ms": round(idle * 1000, 3),
+            "new_articles": new_articles,
+            "feed_requests": server.requests,
+        }
+
+    async def summarize(self) -> Dict[str, Any]:
+        """Drains the unsummarized backlog through the worker pool with the fake LLM."""
+        from fake_llm import FakeLLM
+
+        llm = FakeLLM(self.p["llm_latency"])
+        llm.install()
+        service = self.main.summary_service
+        service.start()
+        try:
+            queued = await service.enqueue_backlog(limit=1_000_000)
+            started = time.perf_counter()
+            # Deferred articles are re-queued after task_done(), so wait until the queue stays empty
+            while True:
+                await service.queue.join()
+                await asyncio.sleep(0.01)
+                if service.queue.empty():
+                    break
+            elapsed = time.perf_counter() - started
+        finally:
+            await service.stop()
+        return {
+            "articles": queued,
+            "workers": service.workers,
+            "llm_latency_s": llm.latency,
+            "llm_requests": llm.requests,
+            "seconds": round(elapsed, 3),
+            "articles_per_second": round(queued / elapsed, 2) if elapsed else None,
+        }
+
+    async def ingest(self) -> Dict[str, Any]:
+        """ingest_articles throughput for new rows, then for the same rows as duplicates."""
+        from fixtures import SyntheticFeed
+        from dedupe import minhash, story_text
+        from parsing import clean_html
+        from ingest import ingest_articles
+        from models import SessionLocal
+
+        feed = SyntheticFeed("Ingest Bench")
+        items = []
+        for n in range(self.p["ingest_rows"]):
+            entry = feed.item(n)
+            content = clean_html(entry["summary"])
+            # Unique URL and title per row; signatures are computed by the parse pool in production
+            title = f"{entry['title']} #{n}"
+            items.append({"title": title, "url": entry["link"], "content": content, "source": "Ingest Bench",
+                          "published_at": entry["published"], "signature": minhash(story_text(title, content))})
+        batch = self.p["ingest_batch"]
+
+        def run(rows: List[Dict[str, Any]]) -> float:
+            started = time.perf_counter()
+            with SessionLocal() as db:
+                for i in range(0, len(rows), batch):
+                    ingest_articles(db, rows[i:i + batch])
+                    db.commit()
+            return time.perf_counter() - started
+
+        new = await asyncio.to_thread(run, items)
+        duplicate = await asyncio.to_thread(run, items)
+        return {
+            "rows": len(items),
+            "batch": batch,
+            "new_rows_per_second": round(len(items) / new, 1),
+            "duplicate_rows_per_second": round(len(items) / duplicate, 1),
+        }
+
+    def seed(self, total: int) -> Dict[str, Any]:
+        """Tops the articles table up to `total` rows: `today_rows` today, the rest over the past year."""
+        from sqlalchemy import func, insert, select
+        from models import SessionLocal, Article
+        from fixtures import SyntheticFeed
+        from sources import SOURCES
+
+        now = datetime.now(timezone.utc)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        rng = random.Random(total)
+        feeds = [SyntheticFeed(s["name"], seed=7) for s in SOURCES]
+        with SessionLocal() as db:
+            existing = db.scalar(select(func.count(Article.id)))
+            existing_today = db.scalar(select(func.count(Article.id)).where(Article.created_at >= today.replace(tzinfo=None)))
+            missing = max(total - existing, 0)
+            today_missing = max(min(self.p["today_rows"] - existing_today, missing), 0)
+            started = time.perf_counter()
+            chunk = []
+            for i in range(missing):
+                feed = feeds[i % len(feeds)]
+                n = existing + i
+                entry = feed.item(n)
+                if i < today_missing:
+                    created = today + (now - today) * rng.random()
+                else:
+                    created = today - timedelta(seconds=rng.uniform(1, 365 * 86400))
+                chunk.append({
+                    "title": entry["title"], "url": f"{entry['link']}?seed={n}", "content": entry["summary"],
+                    "summary": "• Seeded summary", "source": feed.name, "category": "General", "severity": "Medium",
+                    "published_at": entry["published"], "created_at": created,
+                })
+                if len(chunk) == 5000:
+                    db.execute(insert(Article), chunk)
+                    db.commit()
+                    chunk = []
+            if chunk:
+                db.execute(insert(Article), chunk)
+                db.commit()
+            elapsed = time.perf_counter() - started
+        return {"inserted": missing, "seconds": round(elapsed, 3)}
+
+    async def read_latency(self) -> Dict[str, Any]:
+        """/api/news (cold snapshot, warm, 304) and /api/history (first and deep pages) at each table size."""
+        import httpx
+        from news_feed import news_feed
+
+        results = {}
+        transport = httpx.ASGITransport(app=self.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in self.p["rows"]:
+                seeded = await asyncio.to_thread(self.seed, size)
+                requests = self.p["requests"]
+
+                async def timed(path: str, headers: Optional[Dict[str, str]] = None, before=None):
+                    samples, response = [], None
+                    for _ in range(requests):
+                        if before:
+                            before()
+                        started = time.perf_counter()
+                        response = await client.get(path, headers=headers)
+                        samples.append(time.perf_counter() - started)
+                    return latency_stats(samples), response
+
+                news_cold, _ = await timed("/api/news", before=news_feed.invalidate)
+                news_warm, response = await timed("/api/news")
+                news_304, _ = await timed("/api/news", headers={"If-None-Match": response.headers["etag"]})
+                history_first, _ = await timed("/api/history?limit=100")
+
+                # Keyset pagination deep into the archive
+                deep, cursor = [], None
+                for _ in range(self.p["history_pages"]):
+                    started = time.perf_counter()
+                    page = (await client.get("/api/history", params={"limit": 100, **({"cursor": cursor} if cursor else {})})).json()
+                    deep.append(time.perf_counter() - started)
+                    cursor = page["next_cursor"]
+                    if not cursor:
+                        break
+
+                results[str(size)] = {
+                    "rows": self.count_articles(),
+                    "seed": seeded,
+                    "news_items": len(news_feed.rows),
+                    "news_cold": news_cold,
+                    "news_warm": news_warm,
+                    "news_not_modified": news_304,
+                    "history_first_page": history_first,
+                    "history_pages": latency_stats(deep),
+                }
+        return results
+
+    async def sse_fanout(self) -> Dict[str, Any]:
+        """Publisher fan-out to N in-process subscribers (socket writes excluded)."""
+        from events import Publisher
+
+        results = {}
+        events = self.p["events"]
+        for count in self.p["subscribers"]:
+            publisher = Publisher(replay_size=events)
+            subs = [publisher.subscribe() for _ in range(count)]
+            lags: List[float] = []
+
+            async def consume(sub, sample: bool):
+                while True:
+                    frame = await sub.get()
+                    if frame is None or b'"done"' in frame:
+                        return
+                    if sample:
+                        sent = json.loads(frame.split(b"data: ", 1)[1])["sent"]
+                        lags.append(time.perf_counter() - sent)
+
+            # Lag is sampled on every 10th subscriber to keep JSON decoding out of the measurement
+            consumers = [asyncio.create_task(consume(sub, i % 10 == 0)) for i, sub in enumerate(subs)]
+            started = time.perf_counter()
+            for n in range(events):
+                await publisher.publish({"id": n, "title": f"Event {n}", "source": "Bench", "sent": time.perf_counter()})
+                # Bursts of 20, like a fetch cycle announcing its new articles
+                if n % 20 == 19:
+                    await asyncio.sleep(0)
+            await publisher.publish({"id": events, "done": True})
+            await asyncio.gather(*consumers)
+            elapsed = time.perf_counter() - started
+
+            results[str(count)] = {
+                "events": events,
+                "seconds": round(elapsed, 3),
+                "frames_per_second": round(events * count / elapsed, 1),
+                "dropped_frames": sum(sub.dropped for sub in subs),
+                "lag": latency_stats(lags),
+            }
+        return results
+
+    async def run(self, scenarios: List[str]) -> Dict[str, Any]:
+        from models import init_db
+        import scrapers
+
+        init_db()
+        results = {}
+        try:
+            for name in scenarios:
+                logger.warning(f"Running {name}...")
+                results[name] = await getattr(self, name)()
+        finally:
+            await self.main.summary_service.stop()
+            await scrapers.close_client()
+        return results
+
+def flatten(value: Any, prefix: str = "") -> Dict[str, float]:
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+def compare(before_path: str, after_path: str):
+    """Prints every numeric result side by side with its relative change."""
+    with open(before_path) as f:
+        before = flatten(json.load(f)["results"])
+    with open(after_path) as f:
+        after = flatten(json.load(f)["results"])
+    width = max((len(k) for k in after), default=10)
+    print(f"{'metric':<{width}}  {'before':>12}  {'after':>12}  {'change':>8}")
+    for key in sorted(set(before) | set(after)):
+        old, new = before.get(key), after.get(key)
+        change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else ""
+        fmt = lambda v: "" if v is None else f"{v:.3f}" if isinstance(v, float) else str(v)
+        print(f"{key:<{width}}  {fmt(old):>12}  {fmt(new):>12}  {change:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument("--profile", choices=PROFILES, default="default")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--rows", help="Comma-separated table sizes for read_latency, e.g. 10000,1000000")
+    parser.add_argument("--subscribers", help="Comma-separated subscriber counts for sse_fanout")
+    parser.add_argument("--feed-latency", type=float, help="Seconds added to every fixture response")
+    parser.add_argument("--error-rate", type=float, help="Fraction of fixture requests answered with 503")
+    parser.add_argument("--llm-latency", type=float, help="Seconds per fake LLM request")
+    parser.add_argument("--fixtures", default=os.path.join(BENCH_DIR, "fixtures"), help="Recorded feeds directory")
+    parser.add_argument("--workdir", help="Keep the scratch database here instead of a deleted temp directory")
+    parser.add_argument("-o", "--output", help="Write JSON here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    profile = dict(PROFILES[args.profile])
+    for key in ("rows", "subscribers"):
+        if getattr(args, key):
+            profile[key] = [int(v) for v in getattr(args, key).split(",")]
+    for key in ("feed_latency", "error_rate", "llm_latency"):
+        if getattr(args, key) is not None:
+            profile[key] = getattr(args, key)
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    output = os.path.abspath(args.output) if args.output else None
+    workdir = args.workdir or tempfile.mkdtemp(prefix="cyber-news-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    configure_environment(workdir)
+
+    bench = Bench(profile, args.fixtures)
+    # The app logs every request and article at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+    started = time.perf_counter()
+    try:
+        results = asyncio.run(bench.run(scenarios))
+    finally:
+        os.chdir(ROOT)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "version": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "profile": args.profile,
+        "config": profile,
+        "workdir": args.workdir,
+        "duration_s": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+        logger.warning(f"Results written to {output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { Shield, RefreshCw, Trash2, History, LayoutDashboard, Radio, Search, Download, Zap, List, Grid, WifiOff, AlertTriangle, Info } from 'lucide-react';
 import NewsCard from './components/NewsCard';
+import ThreatLandscape from './components/ThreatLandscape';
+import KeywordsCloud from './components/KeywordsCloud';
+import SourceHealth from './components/SourceHealth';
 
 const API_BASE = ''; // Relative paths for local serving
 
@@ -8,13 +11,17 @@ function App() {
   // State
   const [news, setNews] = useState([]);
   const [history, setHistory] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null);
   const [view, setView] = useState('dashboard'); // 'dashboard', 'history'
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [statusMessage, setStatusMessage] = useState('Initializing local intel feed...');
   const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
   const [selectedCategory, setSelectedCategory] = useState('All');
   const [isOnline, setIsOnline] = useState(navigator.onLine);
+  const [stats, setStats] = useState(null);
+  const [sourceHealth, setSourceHealth] = useState([]);
 
   // Persistence (Safety wrapped)
   const [readArticles, setReadArticles] = useState(() => {
@@ -43,12 +50,29 @@ function App() {
     } catch (e) {}
   }, [bookmarkedArticles]);
 
+  // Server-side aggregates and per-source health for the dashboard widgets (non-fatal if unavailable)
+  const fetchStats = async () => {
+    try {
+      const [statsRes, sourcesRes] = await Promise.all([
+        fetch(`${API_BASE}/api/stats?window=1d`),
+        fetch(`${API_BASE}/api/sources`)
+      ]);
+      if (statsRes.ok) setStats(await statsRes.json());
+      if (sourcesRes.ok) {
+        const data = await sourcesRes.json();
+        setSourceHealth(Array.isArray(data) ? data : []);
+      }
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
   // Initial Data Fetch
   const fetchData = async () => {
     setLoading(true);
     setError(null);
     try {
-      const res = await fetch(`${API_BASE}/api/news`);
+      const res = await fetch(`${API_BASE}/api/news?collapse=true`);
       if (!res.ok) throw new Error('Failed to fetch news feed');
       const data = await res.json();
       setNews(Array.isArray(data) ? data : []);
@@ -56,7 +80,8 @@ function App() {
       const histRes = await fetch(`${API_BASE}/api/history`);
       if (histRes.ok) {
         const histData = await histRes.json();
-        setHistory(Array.isArray(histData) ? histData : []);
+        setHistory(Array.isArray(histData?.items) ? histData.items : []);
+        setHistoryCursor(histData?.next_cursor || null);
       }
     } catch (err) {
       console.error(err);
@@ -68,6 +93,8 @@ function App() {
 
   useEffect(() => {
     fetchData();
+    fetchStats();
+    const statsTimer = setInterval(fetchStats, 60000);
 
     // SSE Real-time Updates
     const eventSource = new EventSource(`${API_BASE}/api/stream`);
@@ -81,6 +108,12 @@ function App() {
           return;
         }
 
+        // Missed more events than the server can replay: reload the feed
+        if (data.resync) {
+          fetchData();
+          return;
+        }
+
         // It's a news article update
         setNews(prev => {
           const index = prev.findIndex(a => a.id === data.id);
@@ -89,6 +122,19 @@ function App() {
             updated[index] = { ...updated[index], ...data };
             return updated;
           }
+          // Another report of a story we already show: attach it instead of adding a card
+          const clusterIndex = data.cluster_id ? prev.findIndex(a => a.cluster_id === data.cluster_id) : -1;
+          if (clusterIndex !== -1) {
+            const updated = [...prev];
+            const related = updated[clusterIndex].related || [];
+            if (!related.some(r => r.id === data.id)) {
+              updated[clusterIndex] = {
+                ...updated[clusterIndex],
+                related: [...related, { id: data.id, title: data.title, url: data.url, source: data.source }]
+              };
+            }
+            return updated;
+          }
           return [data, ...prev];
         });
       } catch (e) {
@@ -97,12 +143,8 @@ function App() {
     };
 
     eventSource.onerror = (e) => {
+      // The browser reconnects on its own and sends Last-Event-ID, so missed events are replayed
       console.warn("SSE Connection lost. Retrying...");
-      eventSource.close();
-      // Re-establish after 5s
-      setTimeout(() => {
-        if (view === 'dashboard') fetchData();
-      }, 5000);
     };
 
     const handleOnline = () => setIsOnline(true);
@@ -111,6 +153,7 @@ function App() {
     window.addEventListener('offline', handleOffline);
 
     return () => {
+      clearInterval(statsTimer);
       eventSource.close();
       window.removeEventListener('online', handleOnline);
       window.removeEventListener('offline', handleOffline);
@@ -140,8 +183,49 @@ function App() {
     });
   };
 
+  // Keyset pagination through the archive
+  const loadMoreHistory = async () => {
+    if (!historyCursor) return;
+    try {
+      const res = await fetch(`${API_BASE}/api/history?cursor=${encodeURIComponent(historyCursor)}`);
+      if (!res.ok) throw new Error('Failed to fetch archive page');
+      const data = await res.json();
+      setHistory(prev => [...prev, ...(data.items || [])]);
+      setHistoryCursor(data.next_cursor || null);
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
+  // Archive search runs server-side (full-text index over the whole retention window)
+  useEffect(() => {
+    if (view !== 'history' || !searchQuery.trim()) {
+      setSearchResults(null);
+      return;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const params = new URLSearchParams({ q: searchQuery, limit: '100' });
+        if (selectedCategory !== 'All') params.set('category', selectedCategory);
+        const res = await fetch(`${API_BASE}/api/search?${params}`, { signal: controller.signal });
+        if (!res.ok) throw new Error('Search failed');
+        const data = await res.json();
+        setSearchResults(data.items || []);
+      } catch (err) {
+        if (err.name !== 'AbortError') console.error(err);
+      }
+    }, 300);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [view, searchQuery, selectedCategory]);
+
   // Filter Logic
   const filteredNews = useMemo(() => {
+    if (view === 'history' && searchResults) return searchResults;
+
     let result = view === 'dashboard' ? news : history;
 
     if (selectedCategory !== 'All') {
@@ -158,7 +242,7 @@ function App() {
     }
 
     return result;
-  }, [news, history, view, selectedCategory, searchQuery]);
+  }, [news, history, view, selectedCategory, searchQuery, searchResults]);
 
   return (
     <div className="min-h-screen bg-slate-950 text-slate-100 font-sans selection:bg-blue-500/30">
@@ -232,6 +316,14 @@ function App() {
           </div>
         </div>
 
+        {view === 'dashboard' && (
+          <>
+            <ThreatLandscape stats={stats} onFilterCategory={setSelectedCategory} />
+            <KeywordsCloud stats={stats} onSearch={setSearchQuery} />
+            {sourceHealth.length > 0 && <SourceHealth health={sourceHealth} />}
+          </>
+        )}
+
         {/* Content States */}
         {loading && news.length === 0 ? (
           <div className="flex flex-col items-center justify-center py-20 text-slate-500">
@@ -266,6 +358,17 @@ function App() {
             ))}
           </div>
         )}
+
+        {view === 'history' && historyCursor && !searchResults && !loading && !error && (
+          <div className="flex justify-center mt-8">
+            <button
+              onClick={loadMoreHistory}
+              className="bg-slate-800 hover:bg-slate-700 border border-slate-700 text-slate-300 px-6 py-2 rounded-lg text-sm transition-colors"
+            >
+              Load older intel
+            </button>
+          </div>
+        )}
       </main>
 
       {/* Offline Banner */}
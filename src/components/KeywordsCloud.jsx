@@ -1,27 +1,9 @@
 import React from 'react';
 import { Tag } from 'lucide-react';
 
-const KeywordsCloud = ({ news, onSearch }) => {
-  const keywords = React.useMemo(() => {
-    const stopWords = new Set(['this', 'that', 'with', 'from', 'your', 'their', 'they', 'them', 'these', 'those', 'which', 'what', 'where', 'when', 'could', 'would', 'should', 'about', 'after', 'before', 'using', 'against', 'during', 'through', 'between', 'under', 'over', 'cyber', 'security', 'news', 'attack', 'data', 'breach', 'report', 'new', 'more', 'first', 'after', 'been', 'were', 'also', 'will', 'have', 'hackers', 'malware', 'ransomware', 'users', 'company', 'service', 'million', 'billion']);
-
-    const wordCounts = {};
-    news.forEach(art => {
-      const words = art.title.toLowerCase()
-        .replace(/[^\w\s]/g, '')
-        .split(/\s+/)
-        .filter(w => w.length > 4 && !stopWords.has(w));
-
-      words.forEach(w => {
-        wordCounts[w] = (wordCounts[w] || 0) + 1;
-      });
-    });
-
-    return Object.entries(wordCounts)
-      .map(([text, count]) => ({ text, count }))
-      .sort((a, b) => b.count - a.count)
-      .slice(0, 15);
-  }, [news]);
+// `stats` is the /api/stats response; keyword counts are aggregated server-side
+const KeywordsCloud = ({ stats, onSearch }) => {
+  const keywords = stats?.keywords || [];
 
   if (keywords.length === 0) return null;
 
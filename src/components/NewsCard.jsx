@@ -5,6 +5,21 @@ const NewsCard = ({ article, isRead, onToggleRead, isBookmarked, onToggleBookmar
   const [copied, setCopied] = useState(false);
   const [shared, setShared] = useState(false);
   const [isExpanded, setIsExpanded] = useState(false);
+  const [fullContent, setFullContent] = useState(article.content);
+
+  // List endpoints omit the scraped content; fetch it the first time the card is expanded
+  const toggleExpanded = async () => {
+    const next = !isExpanded;
+    setIsExpanded(next);
+    if (next && fullContent === undefined) {
+      try {
+        const res = await fetch(`/api/articles/${article.id}`);
+        if (res.ok) setFullContent((await res.json()).content || null);
+      } catch (e) {
+        setFullContent(null);
+      }
+    }
+  };
 
   const highlightText = (text, query) => {
     if (!text) return text;
@@ -188,7 +203,7 @@ const NewsCard = ({ article, isRead, onToggleRead, isBookmarked, onToggleBookmar
             <Bookmark size={14} fill={isBookmarked ? "currentColor" : "none"} />
           </button>
           <button onClick={() => onToggleRead(article.url)} className="p-1.5 text-slate-400 hover:text-blue-400" title="Mark Read"><Eye size={14} /></button>
-          <button onClick={() => setIsExpanded(!isExpanded)} className={`p-1.5 transition-colors ${isExpanded ? 'text-blue-400' : 'text-slate-400 hover:text-blue-400'}`} title="View Full Content"><FileText size={14} /></button>
+          <button onClick={toggleExpanded} className={`p-1.5 transition-colors ${isExpanded ? 'text-blue-400' : 'text-slate-400 hover:text-blue-400'}`} title="View Full Content"><FileText size={14} /></button>
           <button onClick={shareIntel} className="p-1.5 text-slate-400 hover:text-blue-400" title="Share"><Share2 size={14} /></button>
           <a href={article.url} target="_blank" rel="noopener noreferrer" className="p-1.5 text-slate-400 hover:text-blue-400" title="Source"><ExternalLink size={14} /></a>
         </div>
@@ -198,7 +213,7 @@ const NewsCard = ({ article, isRead, onToggleRead, isBookmarked, onToggleBookmar
           <div className="font-bold mb-1 flex items-center gap-1 text-slate-500 uppercase tracking-tighter">
             <Activity size={10} /> Full Scraped Content
           </div>
-          <p className="line-clamp-6 italic">{article.content || 'No detailed content available.'}</p>
+          <p className="line-clamp-6 italic">{fullContent || 'No detailed content available.'}</p>
         </div>
       )}
       </>
@@ -259,7 +274,7 @@ const NewsCard = ({ article, isRead, onToggleRead, isBookmarked, onToggleBookmar
             {copied ? <Check size={16} className="text-green-500" /> : <Copy size={16} />}
           </button>
           <button
-            onClick={() => setIsExpanded(!isExpanded)}
+            onClick={toggleExpanded}
             className={`p-2 transition-all rounded-md ${isExpanded ? 'bg-blue-900/40 text-blue-400' : 'text-slate-500 hover:text-blue-400 hover:bg-blue-900/20'}`}
             title="View Full Content"
           >
@@ -301,13 +316,13 @@ const NewsCard = ({ article, isRead, onToggleRead, isBookmarked, onToggleBookmar
           </div>
         )}
 
-        {isExpanded && article.content && (
+        {isExpanded && fullContent && (
           <div className="mt-4 p-4 bg-slate-900/50 border border-slate-700/30 rounded-lg text-xs text-slate-400 animate-fade-in">
             <div className="font-bold mb-2 flex items-center gap-1 text-slate-500 uppercase tracking-tighter">
               <Activity size={12} /> Technical Raw Intelligence
             </div>
             <p className="italic leading-relaxed">
-              {highlightText(article.content, searchQuery)}
+              {highlightText(fullContent, searchQuery)}
             </p>
           </div>
         )}
@@ -330,6 +345,22 @@ const NewsCard = ({ article, isRead, onToggleRead, isBookmarked, onToggleBookmar
               {getSourceBadge(article.source).label}
             </span>
           )}
+          {article.related?.length > 0 && (
+            <div className="flex flex-wrap gap-1 mt-2">
+              <span className="text-[9px] uppercase tracking-tighter text-slate-500">Also reported by:</span>
+              {article.related.map((rel) => (
+                <a
+                  key={rel.id}
+                  href={rel.url}
+                  target="_blank"
+                  rel="noopener noreferrer"
+                  className="text-[9px] font-mono bg-slate-700/30 px-1.5 rounded text-slate-400 hover:text-blue-400"
+                >
+                  {rel.source}
+                </a>
+              ))}
+            </div>
+          )}
         </div>
         <a
           href={article.url}
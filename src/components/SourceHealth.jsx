@@ -1,13 +1,14 @@
 import React from 'react';
-import { Activity, CheckCircle2, AlertCircle, Clock } from 'lucide-react';
+import { Activity } from 'lucide-react';
 
-const SourceHealth = ({ sources, currentStatus }) => {
-  // Parse the currentStatus message to see if we're currently scraping a specific source
-  const activeSource = currentStatus?.includes('Collecting from')
-    ? currentStatus.replace('Collecting from ', '').replace('...', '')
-    : currentStatus?.includes('Scraping')
-      ? currentStatus.replace('Scraping ', '').replace('...', '')
-      : null;
+// `health` is the /api/sources response: one entry per registry source
+const SourceHealth = ({ health = [] }) => {
+  const failing = health.filter(s => s.error_streak > 0).length;
+
+  const formatInterval = (seconds) => {
+    if (!seconds) return '—';
+    return seconds >= 3600 ? `${(seconds / 3600).toFixed(1)}h` : `${Math.round(seconds / 60)}m`;
+  };
 
   return (
     <div className="bg-slate-800/40 border border-slate-700/50 rounded-xl p-4 mb-8">
@@ -17,30 +18,37 @@ const SourceHealth = ({ sources, currentStatus }) => {
           <h2 className="text-xs font-black uppercase tracking-widest text-slate-400">Intelligence Source Network</h2>
         </div>
         <div className="text-[9px] font-mono text-slate-500 uppercase">
-          {sources.length} active nodes
+          {health.length - failing} healthy / {failing} failing
         </div>
       </div>
 
       <div className="grid grid-cols-2 sm:grid-cols-3 md:grid-cols-4 lg:grid-cols-7 gap-2">
-        {sources.map((source) => {
-          const isActive = activeSource === source;
+        {health.map((source) => {
+          const isFailing = source.error_streak > 0;
+          const isPending = source.last_status === 'pending';
+          const isDegraded = source.last_status === 'degraded';
+          const lastSuccess = source.last_success_at ? new Date(source.last_success_at + 'Z').toLocaleString() : 'never';
           return (
             <div
-              key={source}
+              key={source.name}
+              title={isFailing
+                ? `${source.last_error} (${source.error_streak} failures in a row, last success: ${lastSuccess})`
+                : isDegraded
+                ? `${source.last_error} (last poll: ${lastSuccess})`
+                : `Last success: ${lastSuccess} · ${source.latency_ms ?? '—'}ms · every ${formatInterval(source.interval)}`}
               className={`p-2 rounded-lg border transition-all flex items-center gap-2 ${
-                isActive
-                  ? 'bg-blue-900/20 border-blue-500/50 animate-pulse'
+                isFailing
+                  ? 'bg-red-900/20 border-red-500/40'
                   : 'bg-slate-900/30 border-slate-800'
               }`}
             >
-              {isActive ? (
-                <div className="w-2 h-2 bg-blue-500 rounded-full animate-ping"></div>
-              ) : (
-                <div className="w-2 h-2 bg-emerald-500/50 rounded-full"></div>
-              )}
-              <span className={`text-[10px] font-bold truncate ${isActive ? 'text-blue-400' : 'text-slate-500'}`}>
-                {source}
+              <div className={`w-2 h-2 rounded-full ${
+                isFailing ? 'bg-red-500 animate-pulse' : isPending ? 'bg-slate-600' : isDegraded ? 'bg-amber-500/70' : 'bg-emerald-500/50'
+              }`}></div>
+              <span className={`text-[10px] font-bold truncate ${isFailing ? 'text-red-400' : 'text-slate-500'}`}>
+                {source.name}
               </span>
+              <span className="ml-auto text-[9px] font-mono text-slate-600">{formatInterval(source.interval)}</span>
             </div>
           );
         })}
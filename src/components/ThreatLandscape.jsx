@@ -1,21 +1,12 @@
 import React from 'react';
 import { PieChart, Activity, TrendingUp } from 'lucide-react';
 
-const ThreatLandscape = ({ news, onFilterCategory }) => {
-  const stats = React.useMemo(() => {
-    const counts = {};
-    news.forEach(art => {
-      const cat = art.category || 'General';
-      counts[cat] = (counts[cat] || 0) + 1;
-    });
+// `stats` is the /api/stats response; categories arrive pre-counted and sorted
+const ThreatLandscape = ({ stats: landscape, onFilterCategory }) => {
+  const stats = landscape?.categories || [];
+  const total = landscape?.total || 0;
 
-    // Sort by count descending
-    return Object.entries(counts)
-      .map(([name, count]) => ({ name, count }))
-      .sort((a, b) => b.count - a.count);
-  }, [news]);
-
-  if (news.length === 0) return null;
+  if (total === 0) return null;
 
   return (
     <div className="bg-slate-800/40 border border-slate-700/50 rounded-xl p-6 mb-8 backdrop-blur-sm">
@@ -23,7 +14,7 @@ const ThreatLandscape = ({ news, onFilterCategory }) => {
         <div className="flex items-center gap-2">
           <Activity size={20} className="text-blue-400 animate-pulse" />
           <h2 className="text-sm font-black uppercase tracking-widest text-slate-400">Today's Threat Landscape</h2>
-          <span className="bg-slate-700 text-[10px] px-2 py-0.5 rounded text-slate-300 font-mono ml-2">Σ {news.length} ITEMS</span>
+          <span className="bg-slate-700 text-[10px] px-2 py-0.5 rounded text-slate-300 font-mono ml-2">Σ {total} ITEMS</span>
         </div>
         <div className="text-[10px] font-mono text-slate-500 flex items-center gap-4">
           <div className="flex items-center gap-1">
@@ -56,7 +47,7 @@ const ThreatLandscape = ({ news, onFilterCategory }) => {
                   stat.name === 'Malware' ? 'bg-yellow-500' :
                   stat.name === 'Policy/Legal' ? 'bg-blue-500' : 'bg-slate-500'
                 }`}
-                style={{ width: `${(stat.count / news.length) * 100}%` }}
+                style={{ width: `${(stat.count / total) * 100}%` }}
               ></div>
             </div>
           </button>
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# api/ modules import each other by bare name, as they do when served
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+
+# Scratch database and single-process mode, set before models is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("COORDINATION", "none")
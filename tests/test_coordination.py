@@ -0,0 +1,33 @@
+import asyncio
+
+from coordination import LeaderLease
+
+def test_slow_election_handler_does_not_stall_renewal():
+    from models import init_db
+
+    init_db()
+
+    async def run():
+        elected = asyncio.Event()
+        demoted = []
+
+        async def on_elected():
+            elected.set()
+            await asyncio.sleep(1.0)  # Much longer than the TTL below
+
+        async def on_demoted():
+            demoted.append(True)
+
+        leader = LeaderLease(on_elected=on_elected, on_demoted=on_demoted, name="test", ttl=0.3, enabled=True)
+        rival = LeaderLease(name="test", ttl=0.3, enabled=True)
+        await asyncio.wait_for(leader.start(), 0.5)
+        await elected.wait()
+        # The lease keeps being renewed while the handler is still running
+        await asyncio.sleep(0.6)
+        rival_won = await rival.try_acquire()
+        await leader.stop()
+        return leader, rival_won, demoted
+
+    leader, rival_won, demoted = asyncio.run(run())
+    assert not rival_won
+    assert demoted == [True] and not leader.is_leader
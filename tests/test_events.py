@@ -0,0 +1,36 @@
+import json
+
+import events
+from events import Publisher, Subscriber
+
+def drain(sub: Subscriber):
+    frames = []
+    while not sub.queue.empty():
+        frames.append(sub.queue.get_nowait())
+    return frames
+
+def event_ids(frames):
+    return [int(f.decode().split("\n")[0][4:]) for f in frames]
+
+def test_replay_larger_than_queue_sends_resync():
+    publisher = Publisher(replay_size=1000)
+    for n in range(1, 601):
+        publisher.deliver(n, {"id": n}, replayable=True)
+
+    frames = drain(publisher.subscribe("100"))
+    assert len(frames) == 1
+    assert json.loads(frames[0].decode().split("data: ")[1]) == {"resync": True}
+
+def test_replay_within_queue_delivers_every_missed_event():
+    publisher = Publisher(replay_size=1000)
+    for n in range(1, 601):
+        publisher.deliver(n, {"id": n}, replayable=True)
+
+    assert event_ids(drain(publisher.subscribe("550"))) == list(range(551, 601))
+
+def test_slow_policy_is_read_at_call_time(monkeypatch):
+    monkeypatch.setattr(events, "SSE_SLOW_POLICY", "disconnect")
+    sub = Subscriber(maxsize=1)
+    sub.offer(b"a")
+    sub.offer(b"b")
+    assert sub.closed
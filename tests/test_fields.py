@@ -0,0 +1,29 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from schemas import LIST_FIELDS, parse_fields
+
+def test_additive_forms():
+    expected = LIST_FIELDS + ["content"]
+    assert parse_fields("*,content") == expected
+    assert parse_fields("+content") == expected
+    # An unescaped + in a query string arrives as a space
+    assert parse_fields(" content") == expected
+
+def test_explicit_list_with_spaces_is_not_additive():
+    assert parse_fields("title, content") == ["id", "title", "content"]
+
+def test_literal_plus_in_query_string():
+    from sqlalchemy import insert
+    from models import Article, engine, init_db
+    from routes import router
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(Article).values(title="t", url="https://example.org/fields", content="body", source="Test"))
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    for query in ("fields=+content", "fields=%2Bcontent", "fields=*,content"):
+        item = client.get(f"/api/history?{query}").json()["items"][0]
+        assert set(item) == set(LIST_FIELDS + ["content"])
@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+def test_etag_differs_per_encoding_and_matches_any_of_them():
+    from sqlalchemy import insert
+    from models import Article, engine, init_db
+    from routes import router
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(insert(Article).values(title="Compressible", url="https://example.org/etag",
+                                            content="padding " * 500, source="Test"))
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    url = "/api/news?fields=*,content"
+
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert identity.headers["etag"] != gzipped.headers["etag"]
+
+    # A cache holding either variant revalidates against the other
+    for etag in (identity.headers["etag"], "W/" + gzipped.headers["etag"]):
+        response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["etag"] == gzipped.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": '"stale-gz"'}).status_code == 200
@@ -0,0 +1,94 @@
+import asyncio
+
+import parsing
+import pipeline
+import scrapers
+
+FEEDS = {
+    "Good": [{"title": "Patch Tuesday", "url": "https://example.org/patch-tuesday", "content": "Fixes", "source": "Good",
+              "published_at": None}],
+    "Broken": [{"title": "Bad link", "url": "http://[broken/x", "content": "Oops", "source": "Broken",
+                "published_at": None}],
+}
+
+def test_malformed_item_url_only_degrades_its_source(monkeypatch):
+    from models import init_db
+
+    async def fetch_feed(url, source_name):
+        return {"status": "ok", "body": b"<rss/>", "latency": 0.0, "error": None}
+
+    async def parse_feed_body(body, source_name, limit=10):
+        return [dict(article) for article in FEEDS[source_name]]
+
+    async def noop():
+        pass
+
+    monkeypatch.setattr(scrapers, "fetch_feed", fetch_feed)
+    monkeypatch.setattr(scrapers, "parse_feed_body", parse_feed_body)
+    monkeypatch.setattr(scrapers, "load_feed_cache", noop)
+    init_db()
+
+    stored = []
+
+    async def on_new(row):
+        stored.append(row)
+
+    sources = [{"name": name, "url": f"https://{name.lower()}.example/feed"} for name in FEEDS]
+    result = asyncio.run(pipeline.run_pipeline(sources, on_new))
+
+    assert [row["url"] for row in stored] == ["https://example.org/patch-tuesday"]
+    assert result.outcomes["Good"]["status"] == "ok"
+    assert result.outcomes["Broken"]["status"] == "degraded"
+
+def test_parse_error_reaches_only_that_feeds_caller(monkeypatch):
+    def parse_feed(body, source_name, limit=10):
+        if source_name == "Broken":
+            raise ValueError("not a feed")
+        return [{"title": "ok", "source": source_name}]
+
+    monkeypatch.setattr(parsing, "parse_feed", parse_feed)
+    monkeypatch.setattr(parsing, "PARSE_EXECUTOR", "thread")
+    monkeypatch.setattr(parsing, "_executor", None)
+
+    async def run():
+        batcher = parsing.ParseBatcher(batch_size=2)
+        return await asyncio.gather(batcher.parse(b"", "Good"), batcher.parse(b"", "Broken"), return_exceptions=True)
+
+    try:
+        good, broken = asyncio.run(run())
+    finally:
+        parsing.shutdown_executor()
+    assert good == [{"title": "ok", "source": "Good"}]
+    assert isinstance(broken, ValueError)
+
+def test_parse_error_marks_source_failed_and_forgets_its_feed(monkeypatch):
+    from models import init_db
+
+    async def fetch_feed(url, source_name):
+        return {"status": "ok", "body": b"<rss/>", "latency": 0.0, "error": None}
+
+    def parse_feed(body, source_name, limit=10):
+        raise ValueError("not a feed")
+
+    async def noop():
+        pass
+
+    forgotten = []
+    monkeypatch.setattr(scrapers, "fetch_feed", fetch_feed)
+    monkeypatch.setattr(scrapers, "load_feed_cache", noop)
+    monkeypatch.setattr(scrapers, "forget_feed", forgotten.append)
+    monkeypatch.setattr(scrapers, "_parse_batcher", None)
+    monkeypatch.setattr(parsing, "parse_feed", parse_feed)
+    monkeypatch.setattr(parsing, "PARSE_EXECUTOR", "thread")
+    monkeypatch.setattr(parsing, "_executor", None)
+    init_db()
+
+    async def on_new(row):
+        pass
+
+    try:
+        result = asyncio.run(pipeline.run_pipeline([{"name": "Broken", "url": "https://broken.example/feed"}], on_new))
+    finally:
+        parsing.shutdown_executor()
+    assert result.outcomes["Broken"]["status"] == "error"
+    assert forgotten == ["Broken"]
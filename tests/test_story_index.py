@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from dedupe import StoryIndex, minhash, story_text
+
+STORY = story_text("Ivanti zero day", "Ivanti warns of an actively exploited zero day in Connect Secure gateways " * 3)
+
+def test_readd_then_prune_leaves_no_dangling_bucket_entries():
+    index = StoryIndex()
+    signature = minhash(STORY)
+    old = datetime(2026, 1, 1)
+    index.add(1, signature, 1, old)
+    # Re-election reloads the same signatures
+    index.add(1, signature, 1, old)
+    assert all(bucket.count(1) == 1 for bucket in index.buckets.values())
+
+    index.prune(old + timedelta(days=1))
+    assert len(index) == 0 and not index.buckets
+    # Used to raise KeyError on the stale bucket entry
+    assert index.assign(2, signature, old + timedelta(days=2)) == 2
+
+def test_load_story_index_twice_does_not_duplicate():
+    from models import init_db, SessionLocal
+    from ingest import ingest_articles, load_story_index, story_index
+
+    init_db()
+    with SessionLocal() as db:
+        ingest_articles(db, [{"title": "Ivanti zero day", "url": "https://example.org/ivanti", "content": STORY,
+                              "source": "Test", "published_at": None}])
+        db.commit()
+        load_story_index(db)
+        loaded = len(story_index)
+        load_story_index(db)
+    assert loaded >= 1 and len(story_index) == loaded
+    assert all(len(bucket) == len(set(bucket)) for bucket in story_index.buckets.values())
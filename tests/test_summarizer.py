@@ -0,0 +1,57 @@
+import re
+import json
+import asyncio
+
+import summarizer
+
+ITEMS = [(1, "first article"), (2, "second article"), (3, "third article")]
+
+def run_batch(monkeypatch, generate, items=ITEMS):
+    singles = []
+
+    async def summarize_article(content):
+        singles.append(content)
+        return "CATEGORY: Malware\nSEVERITY: High\nSUMMARY:\n- single"
+
+    monkeypatch.setattr(summarizer, "get_client", lambda: object())
+    monkeypatch.setattr(summarizer, "generate", generate)
+    monkeypatch.setattr(summarizer, "summarize_article", summarize_article)
+    results = asyncio.run(summarizer.summarize_batch(items))
+    return results, singles
+
+def test_failed_batch_request_is_not_retried_per_item(monkeypatch):
+    async def generate(*args, **kwargs):
+        raise RuntimeError("429 RESOURCE_EXHAUSTED")
+
+    results, singles = run_batch(monkeypatch, generate)
+    assert results == {1: None, 2: None, 3: None}
+    assert singles == []
+
+def test_unparseable_batch_response_is_split_until_the_bad_article_is_isolated(monkeypatch):
+    calls = []
+
+    async def generate(prompt, **kwargs):
+        calls.append(prompt)
+        if "second article" in prompt:
+            return "not json"
+        ids = [int(i) for i in re.findall(r"### Article id=(\d+)", prompt)]
+        return json.dumps([{"id": i, "category": "Vulnerability", "severity": "High", "summary": ["a"]} for i in ids])
+
+    results, singles = run_batch(monkeypatch, generate, ITEMS + [(4, "fourth article")])
+    assert results[3][0] == results[4][0] == "Vulnerability"
+    # Only the half that keeps derailing the model ends up as single calls
+    assert singles == ["first article", "second article"]
+    assert results[1][0] == results[2][0] == "Malware"
+    assert len(calls) == 3
+
+def test_items_missing_from_a_valid_response_fall_back_to_single_calls(monkeypatch):
+    async def generate(*args, **kwargs):
+        return json.dumps([
+            {"id": 1, "category": "Vulnerability", "severity": "Critical", "summary": ["a", "b", "c"]},
+            {"id": 2, "category": "bogus", "severity": "High", "summary": ["a"]},
+        ])
+
+    results, singles = run_batch(monkeypatch, generate)
+    assert results[1][0] == "Vulnerability"
+    assert singles == ["second article", "third article"]
+    assert results[2][0] == results[3][0] == "Malware"
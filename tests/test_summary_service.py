@@ -0,0 +1,34 @@
+import asyncio
+
+import summary_service
+from summary_service import SummarizationService
+
+def test_cluster_sibling_summary_is_not_reused(monkeypatch):
+    from models import init_db, SessionLocal, Article
+
+    init_db()
+    with SessionLocal() as db:
+        first = Article(title="CISA Adds Two Known Exploited Vulnerabilities to Catalog", url="https://example.org/kev-1",
+                        content="CVE-2024-3400 PAN-OS", source="CISA", cluster_id=9001,
+                        category="Vulnerability", severity="Critical", summary="- CVE-2024-3400")
+        second = Article(title="CISA Adds Two Known Exploited Vulnerabilities to Catalog", url="https://example.org/kev-2",
+                         content="CVE-2023-4966 NetScaler", source="CISA", cluster_id=9001)
+        db.add_all([first, second])
+        db.commit()
+        second_id = second.id
+
+    sent = []
+
+    async def summarize_batch(items):
+        sent.extend(items)
+        return {i: ("Vulnerability", "High", "- CVE-2023-4966") for i, _ in items}
+
+    async def publish(message):
+        pass
+
+    monkeypatch.setattr(summary_service, "summarize_batch", summarize_batch)
+    asyncio.run(SummarizationService(publish).summarize_many([second_id]))
+
+    assert sent == [(second_id, "CVE-2023-4966 NetScaler")]
+    with SessionLocal() as db:
+        assert db.get(Article, second_id).summary == "- CVE-2023-4966"